@@ -4,49 +4,63 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import re
 import os
-import glob
+import pyarrow.csv as pacsv
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-# polyCode.txt 파일 읽기 (행정동 코드/이름 정보)
-code = pd.read_csv('polyCode.txt', sep="|")
+# 집계 결과는 Parquet(zstd 압축)으로 저장, 외부 제출용 CSV가 필요할 때만 True로 변경
+save_csv = False
 
-# 컬럼 값에 포함된 ` 기호 제거
-code['polycode'] = code['`polycode`'].str.replace('`', '', regex=False)
-code['name'] = code['`name`'].str.replace('`', '', regex=False)
-code['full_name'] = code['`full_name`'].str.replace('`', '', regex=False)
+# 행정동 단위 집계에 쓸 컬럼명 (정리된 영문 컬럼명 기준, 환경변수 DONG_COL로 지정)
+# 지정하지 않았거나 파일에 없는 컬럼이면 행정동 단위 집계/저장을 생략
+dong_col = os.environ.get('DONG_COL')
 
-# polycode → full_name 매핑 딕셔너리 생성
-codeDict = dict(zip(code['polycode'], code['full_name']))
+# 1시간 (나노초 단위)
+HOUR_NS = 3_600_000_000_000
 
-# 입력/출력 폴더 지정
-input_folder = 'datas/kt_move/202507'
-output_folder = 'output_data_temp'
-os.makedirs(output_folder, exist_ok=True)   # 출력 폴더 없으면 생성
 
-# 입력 폴더 안의 모든 txt 파일 경로 가져오기
-file_list = glob.glob(os.path.join(input_folder, "*.txt"))
+def map_place_codes(codes, code_keys, name_codes, name_categories):
+    """정렬된 코드 배열(LUT)에서 searchsorted로 행정동 풀네임 조회 (없는 코드/빈 이름은 NaN)"""
+    codes = codes.to_numpy(dtype=str)
+    idx = np.searchsorted(code_keys, codes).clip(max=len(code_keys) - 1)
+    # 코드 위치 → 중복 제거된 풀네임 번호 (여러 코드가 같은 이름이어도 카테고리는 하나)
+    name_idx = name_codes[idx]
+    name_idx[code_keys[idx] != codes] = -1
+    return pd.Categorical.from_codes(name_idx, categories=name_categories)
 
-for file_path in file_list:
+
+def floor_to_hour(dt):
+    """datetime 컬럼을 int64 나노초 정수 연산으로 '시' 단위 내림 (NaT는 유지)"""
+    values = dt.to_numpy(dtype='datetime64[ns]')
+    ns = values.view('i8')
+    floored = np.where(np.isnat(values), ns, ns - ns % HOUR_NS)
+    return pd.Series(floored.view('datetime64[ns]'), index=dt.index)
+
+
+def process_file(file_path, code_keys, name_codes, name_categories, output_folder):
+    """txt 파일 하나를 읽어 시간대·연령대별 이동 인구를 집계하고 저장"""
     file_name = os.path.basename(file_path)   # 파일 이름만 추출
 
-    # txt 파일 읽기
-    df = pd.read_csv(file_path, sep='|')
+    # txt 파일 읽기 (PyArrow 멀티스레드 CSV 파서 사용)
+    df = pacsv.read_csv(
+        file_path, parse_options=pacsv.ParseOptions(delimiter='|')
+    ).to_pandas(types_mapper=pd.ArrowDtype)
 
     # 컬럼명 정리: 알파벳/언더바(_) 이외의 문자 제거
     df.columns = [re.sub(r'[^a-zA-Z_]', '', col) for col in df.columns]
 
-    # 출발지/도착지 코드를 문자열로 변환
-    df['start_place_cd'] = df['start_place_cd'].astype(str)
-    df['arv_place_cd'] = df['arv_place_cd'].astype(str)
+    # 행정동 단위 집계 가능 여부를 집계 전에 먼저 확인 (DONG_COL 미지정 안내는 __main__에서 한 번만 출력)
+    has_dong_col = bool(dong_col) and dong_col in df.columns
 
-    # 코드값을 행정동 풀네임으로 매핑
-    df['start_place_cd'] = df['start_place_cd'].map(codeDict)
-    df['arv_place_cd'] = df['arv_place_cd'].map(codeDict)
+    # 출발지/도착지 코드값을 행정동 풀네임으로 매핑 (문자열 변환 후 LUT 조회)
+    df['start_place_cd'] = map_place_codes(df['start_place_cd'], code_keys, name_codes, name_categories)
+    df['arv_place_cd'] = map_place_codes(df['arv_place_cd'], code_keys, name_codes, name_categories)
     
     # 출발/도착 시간 datetime 변환
-    df['start_dt'] = pd.to_datetime(df['start_dt'])
-    df['move_st_hr'] = df['start_dt'].dt.floor("h")   # 출발 시간을 '시' 단위로 내림
-    df['arv_dt'] = pd.to_datetime(df['arv_dt'])
-    df['move_arv_hr'] = df['arv_dt'].dt.floor("h")   # 도착 시간을 '시' 단위로 내림
+    df['start_dt'] = pd.to_datetime(df['start_dt'], format='ISO8601', cache=True)
+    df['move_st_hr'] = floor_to_hour(df['start_dt'])   # 출발 시간을 '시' 단위로 내림
+    df['arv_dt'] = pd.to_datetime(df['arv_dt'], format='ISO8601', cache=True)
+    df['move_arv_hr'] = floor_to_hour(df['arv_dt'])   # 도착 시간을 '시' 단위로 내림
     
     # (필터링용 코드 — 현재는 주석 처리됨)
     # arange_datas = df[['move_st_hr', 'move_arv_hr', 'start_place_cd', 'arv_place_cd', 'sex_nm', 'age_grp','popl_cnt']]
@@ -54,33 +68,104 @@ for file_path in file_list:
     #      | (arange_datas['move_arv_hr'].dt.hour >= 11) & (arange_datas['move_arv_hr'].dt.hour <= 16)
     # arange_datas = arange_datas[mask]
 
-    # 시간대·연령대별 출발 인구수 합계
-    start_df_time = df.groupby(['move_st_hr', 'age_grp'])['popl_cnt'].sum().reset_index()
-    # 시간대·연령대별 도착 인구수 합계
-    arv_df_time = df.groupby(['move_arv_hr', 'age_grp'])['popl_cnt'].sum().reset_index()
+    # 연령대(10살 단위) 변환 — 집계 키로 쓰이므로 groupby 전에 계산
+    df['age_grp'] = (df['agegrd_nm'] // 10) * 10
 
-    # 행정동 단위 집계 (출발 기준)
-    start_df_time_dong = df.groupby(['start_dt', 'age_grp', '행정동 컬럼명'])['popl_cnt'].sum().reset_index()
-    # 행정동 단위 집계 (도착 기준)
-    arv_df_time_dong = df.groupby(['arv_dt', 'age_grp', '행정동 컬럼명'])['popl_cnt'].sum().reset_index()
+    # 집계 키를 Categorical로 변환해 groupby가 정수 코드로 그룹핑하도록 함
+    # (출발지/도착지 코드는 매핑 단계에서 이미 Categorical)
+    df['age_grp'] = df['age_grp'].astype('category')
 
-    # 연령대(10살 단위) 변환
-    df['age_grp'] = (df['agegrd_nm'] // 10) * 10
-    
-    # 저장할 파일명 정의
-    file_name1 = str(file_name)+" start_time".replace('.txt', '.csv')
-    file_name2 = str(file_name)+" arv_time".replace('.txt', '.csv')
-    file_name3 = str(file_name)+" start_dong_time".replace('.txt', '.csv')
-    file_name4 = str(file_name)+" arv_dong_time".replace('.txt', '.csv')
-
-    # 저장 경로 설정
-    output_path1 = os.path.join(output_folder, file_name1)
-    output_path2 = os.path.join(output_folder, file_name2)
-    output_path3 = os.path.join(output_folder, file_name3)
-    output_path4 = os.path.join(output_folder, file_name4)
-
-    # 각각 다른 집계 데이터를 CSV로 저장
-    start_df_time.to_csv(output_path1, index=False, encoding='euc-kr')
-    arv_df_time.to_csv(output_path2, index=False, encoding='euc-kr')
-    start_df_time_dong.to_csv(output_path3, index=False, encoding='euc-kr')
-    arv_df_time_dong.to_csv(output_path4, index=False, encoding='euc-kr')
+    # 출발/도착 기준을 long 형태로 쌓아 시간대 집계를 한 번의 groupby로 처리
+    time_long = pd.concat([
+        df[['move_st_hr', 'age_grp', 'popl_cnt']].rename(columns={'move_st_hr': 'hr'}).assign(dir='start'),
+        df[['move_arv_hr', 'age_grp', 'popl_cnt']].rename(columns={'move_arv_hr': 'hr'}).assign(dir='arv'),
+    ], ignore_index=True)
+    time_long['dir'] = time_long['dir'].astype('category')
+    time_sum = time_long.groupby(['dir', 'hr', 'age_grp'], observed=True)['popl_cnt'].sum()
+
+    # 시간대·연령대별 출발 / 도착 인구수 합계
+    # (xs는 빈 파일에서 observed=True로 빠진 dir 값을 찾지 못해 KeyError가 나므로 마스크로 선택)
+    time_dir = time_sum.index.get_level_values('dir')
+    start_df_time = time_sum[time_dir == 'start'].droplevel('dir').rename_axis(['move_st_hr', 'age_grp']).reset_index()
+    arv_df_time = time_sum[time_dir == 'arv'].droplevel('dir').rename_axis(['move_arv_hr', 'age_grp']).reset_index()
+
+    # 저장할 파일명 / 경로 정의
+    output_path1 = os.path.join(output_folder, file_name.replace('.txt', ' start_time.parquet'))
+    output_path2 = os.path.join(output_folder, file_name.replace('.txt', ' arv_time.parquet'))
+
+    # 각각 다른 집계 데이터를 Parquet로 저장 (외부 제출용 CSV는 euc-kr)
+    start_df_time.to_parquet(output_path1, index=False, compression='zstd')
+    arv_df_time.to_parquet(output_path2, index=False, compression='zstd')
+    if save_csv:
+        start_df_time.to_csv(output_path1.replace('.parquet', '.csv'), index=False, encoding='euc-kr')
+        arv_df_time.to_csv(output_path2.replace('.parquet', '.csv'), index=False, encoding='euc-kr')
+
+    # 행정동 컬럼이 없으면 행정동 단위 집계는 건너뜀
+    if not has_dong_col:
+        return
+
+    # 행정동 단위 집계도 출발/도착을 쌓아 한 번에 처리
+    dong_long = pd.concat([
+        df[['start_dt', 'age_grp', dong_col, 'popl_cnt']].rename(columns={'start_dt': 'dt'}).assign(dir='start'),
+        df[['arv_dt', 'age_grp', dong_col, 'popl_cnt']].rename(columns={'arv_dt': 'dt'}).assign(dir='arv'),
+    ], ignore_index=True)
+    dong_long['dir'] = dong_long['dir'].astype('category')
+    dong_sum = dong_long.groupby(['dir', 'dt', 'age_grp', dong_col], observed=True)['popl_cnt'].sum()
+
+    # 행정동 단위 집계 (출발 기준 / 도착 기준)
+    dong_dir = dong_sum.index.get_level_values('dir')
+    start_df_time_dong = dong_sum[dong_dir == 'start'].droplevel('dir').rename_axis(['start_dt', 'age_grp', dong_col]).reset_index()
+    arv_df_time_dong = dong_sum[dong_dir == 'arv'].droplevel('dir').rename_axis(['arv_dt', 'age_grp', dong_col]).reset_index()
+
+    output_path3 = os.path.join(output_folder, file_name.replace('.txt', ' start_dong_time.parquet'))
+    output_path4 = os.path.join(output_folder, file_name.replace('.txt', ' arv_dong_time.parquet'))
+
+    start_df_time_dong.to_parquet(output_path3, index=False, compression='zstd')
+    arv_df_time_dong.to_parquet(output_path4, index=False, compression='zstd')
+    if save_csv:
+        start_df_time_dong.to_csv(output_path3.replace('.parquet', '.csv'), index=False, encoding='euc-kr')
+        arv_df_time_dong.to_csv(output_path4.replace('.parquet', '.csv'), index=False, encoding='euc-kr')
+
+
+if __name__ == '__main__':
+    # polyCode.txt 파일 읽기 (행정동 코드/이름 정보)
+    # 정리된 코드표는 feather 캐시로 저장해 다음 실행부터 텍스트 파싱 생략
+    code_cache = 'polyCode.feather'
+    if os.path.exists(code_cache) and os.path.getmtime(code_cache) >= os.path.getmtime('polyCode.txt'):
+        code = pd.read_feather(code_cache)
+    else:
+        code = pd.read_csv('polyCode.txt', sep="|", dtype=str)
+
+        # 컬럼명과 값에 포함된 ` 기호 제거
+        code.columns = code.columns.str.strip('`')
+        code = code[['polycode', 'name', 'full_name']].apply(lambda col: col.str.strip('`'))
+        code.to_feather(code_cache)
+
+    # polycode → full_name 매핑 딕셔너리 생성
+    codeDict = dict(zip(code['polycode'], code['full_name']))
+
+    # 코드 → 풀네임 조회용 정렬 배열 (모든 파일에서 재사용)
+    code_keys = np.array(list(codeDict.keys()))
+    order = np.argsort(code_keys)
+    code_keys = code_keys[order]
+    # 풀네임은 중복/결측이 있을 수 있으므로 factorize로 고유 카테고리와 번호로 분리 (결측은 -1 → NaN)
+    name_codes, name_categories = pd.factorize(np.array(list(codeDict.values()), dtype=object)[order])
+
+    # 행정동 컬럼 미지정 안내는 워커/파일마다가 아니라 실행 시 한 번만 출력
+    if not dong_col:
+        print("⚠️ 행정동 컬럼(DONG_COL) 미지정 — 행정동 단위 집계 생략")
+
+    # 입력/출력 폴더 지정
+    input_folder = 'datas/kt_move/202507'
+    output_folder = 'output_data_temp'
+    os.makedirs(output_folder, exist_ok=True)   # 출력 폴더 없으면 생성
+
+    # 입력 폴더 안의 모든 txt 파일 경로 가져오기
+    with os.scandir(input_folder) as it:
+        file_list = [e.path for e in it if e.is_file() and e.name.endswith('.txt')]
+
+    # 파일 단위로 독립적이므로 프로세스 풀로 병렬 처리
+    worker = partial(process_file, code_keys=code_keys, name_codes=name_codes,
+                     name_categories=name_categories, output_folder=output_folder)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(worker, file_list))
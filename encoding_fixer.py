@@ -1,5 +1,20 @@
-import pandas as pd
+import codecs
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 한 번에 읽어 변환할 바이트 크기 (1 MB)
+CHUNK_SIZE = 1 << 20
+
+
+def convert_encoding(input_path, output_path, src_encoding):
+    """파일을 1 MB 단위로 읽어 src_encoding → UTF-8-SIG로 바로 변환 (CSV 파싱 없음)"""
+    decoder = codecs.getincrementaldecoder(src_encoding)()
+    encoder = codecs.getincrementalencoder('utf-8-sig')()
+    with open(input_path, 'rb') as fin, open(output_path, 'wb') as fout:
+        while chunk := fin.read(CHUNK_SIZE):
+            fout.write(encoder.encode(decoder.decode(chunk)))
+        fout.write(encoder.encode(decoder.decode(b'', final=True), final=True))
+
 
 # 원본 CSV 파일이 있는 폴더 경로 (수정 필요)
 # 예: r"C:\Users\YourName\Documents\Original_CSVs"
@@ -14,36 +29,38 @@ if not os.path.exists(output_folder):
     os.makedirs(output_folder)
     print(f"'{output_folder}' 폴더를 생성했습니다.")
 
-# 입력 폴더 내 모든 파일에 대해 작업 시작
+def convert(entry):
+    """파일(os.DirEntry) 하나의 인코딩을 UTF-8-SIG로 변경 (cp949 실패 시 utf-8 재시도)"""
+    file_name = entry.name
+    input_path = entry.path
+    output_path = os.path.join(output_folder, file_name)
+
+    try:
+        # 한글 깨짐의 주원인인 'cp949' 또는 'euc-kr' 인코딩으로 먼저 읽기를 시도하고,
+        # 'UTF-8-SIG' 인코딩으로 다시 저장합니다.
+        # 만약 다른 인코딩이라면 이 부분을 수정해야 할 수 있습니다.
+        convert_encoding(input_path, output_path, 'cp949')
+
+        print(f"✅ '{file_name}' 인코딩 변경 완료")
+
+    except UnicodeDecodeError:
+        # 만약 'cp949'로도 파일을 읽을 수 없다면, 다른 인코딩일 수 있습니다.
+        # 'utf-8'로 다시 시도해봅니다. (BOM이 이미 있으면 중복되지 않도록 utf-8-sig로 읽음)
+        try:
+            convert_encoding(input_path, output_path, 'utf-8-sig')
+            print(f"✅ '{file_name}' (UTF-8 to UTF-8-SIG) 변경 완료")
+        except Exception as e:
+            print(f"❌ '{file_name}' 파일을 읽는 중 오류 발생: {e}")
+    except Exception as e:
+        print(f"❌ '{file_name}' 처리 중 오류 발생: {e}")
+
+
+# 입력 폴더 내 모든 파일에 대해 작업 시작 (파일별로 독립적이므로 스레드 풀로 동시 변환)
 try:
-    for file_name in os.listdir(input_folder):
-        if file_name.endswith('.csv'):
-            input_path = os.path.join(input_folder, file_name)
-            output_path = os.path.join(output_folder, file_name)
-
-            try:
-                # CSV 파일을 읽습니다.
-                # 한글 깨짐의 주원인인 'cp949' 또는 'euc-kr' 인코딩으로 먼저 읽기를 시도합니다.
-                # 만약 다른 인코딩이라면 이 부분을 수정해야 할 수 있습니다.
-                df = pd.read_csv(input_path, encoding='cp949')
-
-                # 'UTF-8-SIG' 인코딩으로 다시 저장합니다.
-                # index=False는 불필요한 행 번호가 추가되는 것을 방지합니다.
-                df.to_csv(output_path, index=False, encoding='utf-8-sig')
-
-                print(f"✅ '{file_name}' 인코딩 변경 완료")
-
-            except UnicodeDecodeError:
-                # 만약 'cp949'로도 파일을 읽을 수 없다면, 다른 인코딩일 수 있습니다.
-                # 'utf-8'로 다시 시도해봅니다.
-                try:
-                    df = pd.read_csv(input_path, encoding='utf-8')
-                    df.to_csv(output_path, index=False, encoding='utf-8-sig')
-                    print(f"✅ '{file_name}' (UTF-8 to UTF-8-SIG) 변경 완료")
-                except Exception as e:
-                    print(f"❌ '{file_name}' 파일을 읽는 중 오류 발생: {e}")
-            except Exception as e:
-                print(f"❌ '{file_name}' 처리 중 오류 발생: {e}")
+    with os.scandir(input_folder) as it:
+        csv_files = [e for e in it if e.is_file() and e.name.endswith('.csv')]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(convert, csv_files))
 
 except FileNotFoundError:
     print(f"오류: '{input_folder}' 경로를 찾을 수 없습니다. 경로를 확인해주세요.")
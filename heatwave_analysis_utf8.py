@@ -5,9 +5,13 @@
 """
 
 import pandas as pd
+import polars as pl
 import numpy as np
+from numba import njit, prange
 import matplotlib.pyplot as plt
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pyarrow import csv as pacsv
 import warnings
 import sys
 import os
@@ -19,9 +23,50 @@ plt.rcParams['axes.unicode_minus'] = False
 
 # 콘솔 출력 인코딩 설정
 if sys.platform.startswith('win'):
-    # Windows에서 한글 출력 개선
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.detach())
+    # Windows에서 한글 출력 개선 (기존 stdout의 인코딩만 변경, 래퍼 추가 없음)
+    sys.stdout.reconfigure(encoding='utf-8')
+
+@njit(parallel=True)
+def env_scores(T, H, heat_edges, discomfort_edges):
+    """불쾌지수 계산과 폭염위험도·불쾌지수등급 구간 분류를 한 번의 병렬 루프로 처리 (결측·하한 이하는 코드 -1)"""
+    n = T.shape[0]
+    heat_codes = np.empty(n, np.int8)
+    discomfort = np.empty(n, np.float32)
+    discomfort_codes = np.empty(n, np.int8)
+    for i in prange(n):
+        t = T[i]
+        d = 0.81 * t + 0.01 * H[i] * (0.99 * t - 14.3) + 46.3
+        discomfort[i] = d
+        heat_codes[i] = -1 if np.isnan(t) else np.searchsorted(heat_edges, t)
+        discomfort_codes[i] = -1 if np.isnan(d) or d <= 0 else np.searchsorted(discomfort_edges, d)
+    return heat_codes, discomfort, discomfort_codes
+
+def read_csv_cached(path):
+    """PyArrow 멀티스레드 파서로 CSV 읽기 (Parquet 캐시가 최신이면 캐시를 대신 읽음)"""
+    cache_path = path + '.parquet'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return pd.read_parquet(cache_path)
+    df = downcast_numeric(pacsv.read_csv(path, read_options=pacsv.ReadOptions(use_threads=True)).to_pandas())
+    df.to_parquet(cache_path)
+    return df
+
+def downcast_numeric(df):
+    """float64 → float32, int64 → 가장 작은 정수형으로 줄여 메모리 사용량 절감"""
+    for col in df.select_dtypes('float64').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    for col in df.select_dtypes('int64').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+def find_columns(columns, keywords):
+    """역할별 키워드로 컬럼 탐색 (한 컬럼은 먼저 일치한 역할에만 배정, 마지막으로 일치한 컬럼 사용)"""
+    found = dict.fromkeys(keywords)
+    for col in columns:
+        for role, tokens in keywords.items():
+            if any(tok in col or tok in col.lower() for tok in tokens):
+                found[role] = col
+                break
+    return found
 
 class HeatWaveAnalysisUTF8:
     """서울시 폭염 안심 지하 산책로 최적 입지 분석 (UTF-8 버전)"""
@@ -38,27 +83,31 @@ class HeatWaveAnalysisUTF8:
         print("📊 데이터 로딩 중...")
 
         try:
-            # 1. 인구 데이터 (UTF-8 인코딩)
-            self.pop_data = pd.read_csv(
+            # 인구 / 환경 / 이동 데이터 (UTF-8 인코딩) 세 파일을 동시에 읽기
+            paths = [
                 f'{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv',
-                encoding='utf-8'
-            )
-            print(f"✅ 인구 데이터: {len(self.pop_data)}건 로드 완료")
-
-            # 2. 환경 데이터 (UTF-8 인코딩)
-            self.env_data = pd.read_csv(
                 f'{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv',
-                encoding='utf-8'
-            )
-            print(f"✅ 환경 데이터: {len(self.env_data)}건 로드 완료")
-
-            # 3. 이동 데이터 (UTF-8 인코딩)
-            self.move_data = pd.read_csv(
                 f'{self.data_path}서울시 내국인 KT 생활이동 데이터.csv',
-                encoding='utf-8'
-            )
+            ]
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                self.pop_data, self.env_data, self.move_data = executor.map(read_csv_cached, paths)
+
+            print(f"✅ 인구 데이터: {len(self.pop_data)}건 로드 완료")
+            print(f"✅ 환경 데이터: {len(self.env_data)}건 로드 완료")
             print(f"✅ 이동 데이터: {len(self.move_data)}건 로드 완료")
 
+            # 분석에 쓰일 컬럼을 한 번만 탐색해 저장
+            self.env_cols = find_columns(self.env_data.columns, {
+                'temp': ('온도', 'TEMP'),
+                'humidity': ('습도', 'HUMI'),
+                'uv': ('자외선', 'ULTRA', 'UVI'),
+            })
+            self.move_cols = find_columns(self.move_data.columns, {
+                'age': ('연령', 'age'),
+                'sex': ('성별', 'sex'),
+                'population': ('인구', 'popl'),
+            })
+
             # 컬럼명 확인
             print("\n📋 데이터 컬럼 정보:")
             print(f"인구 데이터 컬럼: {list(self.pop_data.columns)}")
@@ -82,60 +131,83 @@ class HeatWaveAnalysisUTF8:
         print(f"👥 총 인구수: {total_population:,}명")
         print(f"🏠 평균 세대당 인구: {avg_household:.2f}명")
 
-        # 응용집계: 인구밀도 등급 (5단계 범주화)
-        self.pop_data['인구밀도등급'] = pd.qcut(
-            self.pop_data.iloc[:, 3],  # 총인구수
-            q=5,
-            labels=['매우낮음', '낮음', '보통', '높음', '매우높음'],
-            duplicates='drop'
+        # 응용집계: 인구밀도 등급 / 가족구조 지수 / 종합 취약성 점수 / 상위 5곳을
+        # Polars LazyFrame 하나의 쿼리 계획으로 계산
+        total_pop_col = self.pop_data.columns[3]    # 총인구수
+        household_col = self.pop_data.columns[5]    # 세대당평균인구
+        density_labels = ['매우낮음', '낮음', '보통', '높음', '매우높음']
+        family_labels = ['1인가구형', '소가족형', '일반가족형', '대가족형']
+
+        # 5분위 내부 경계는 np.nanquantile + np.unique로 구함 (동점으로 겹친 경계는 제거하고 그만큼 상위 등급을 생략)
+        total_pop = self.pop_data[total_pop_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        density_breaks = np.unique(np.nanquantile(total_pop, [0.2, 0.4, 0.6, 0.8])).tolist()
+
+        lf = pl.from_pandas(self.pop_data).lazy().with_columns(
+            # 인구밀도 등급 (5단계 범주화, 오른쪽 닫힌 구간이라 최솟값은 첫 등급)
+            pl.col(total_pop_col).cut(density_breaks, labels=density_labels[:len(density_breaks) + 1])
+            .cast(pl.Enum(density_labels)).alias('인구밀도등급'),
+            # 가족구조 지수 (세대당 인구 0 이하는 결측)
+            pl.when(pl.col(household_col) > 0)
+            .then(pl.col(household_col).cut([2.0, 2.5, 3.0], labels=family_labels))
+            .cast(pl.Enum(family_labels)).alias('가족구조지수'),
+        ).with_columns(
+            # 종합 취약성 점수 (등급 순서대로의 코드 + 1, 결측 등급은 0점)
+            (((pl.col('인구밀도등급').to_physical().cast(pl.Int32).fill_null(-1) + 1) * 0.6 +
+              (pl.col('가족구조지수').to_physical().cast(pl.Int32).fill_null(-1) + 1) * 0.4) * 20)
+            .alias('취약성점수')
         )
+        scored, top = pl.collect_all([
+            lf.select('인구밀도등급', '가족구조지수', '취약성점수'),
+            lf.sort('취약성점수', descending=True, maintain_order=True).head(5),
+        ])
 
-        # 응용집계: 가족구조 지수 계산
-        self.pop_data['가족구조지수'] = pd.cut(
-            self.pop_data.iloc[:, 5],  # 세대당평균인구
-            bins=[0, 2.0, 2.5, 3.0, float('inf')],
-            labels=['1인가구형', '소가족형', '일반가족형', '대가족형']
-        )
-
-        # 응용집계: 종합 취약성 점수 (복합지수)
-        density_score = pd.factorize(self.pop_data['인구밀도등급'])[0] + 1
-        family_score = pd.factorize(self.pop_data['가족구조지수'])[0] + 1
-        self.pop_data['취약성점수'] = (density_score * 0.6 + family_score * 0.4) * 20
+        # 분석 결과는 pandas 프레임에 다시 반영
+        scored = scored.to_pandas()
+        for col in scored.columns:
+            self.pop_data[col] = scored[col].values
+        top_vulnerable = top.to_pandas()
 
         # 상위 취약지역 출력
-        top_vulnerable = self.pop_data.nlargest(5, '취약성점수')
         print("🔍 상위 취약지역 5곳:")
-        for idx, row in top_vulnerable.iterrows():
-            region_name = row.iloc[1]  # 지역명
-            score = row['취약성점수']
-            grade = row['인구밀도등급']
+        region_col = top_vulnerable.columns[1]  # 지역명
+        top_rows = top_vulnerable[[region_col, '취약성점수', '인구밀도등급']]
+        for region_name, score, grade in top_rows.itertuples(index=False, name=None):
             print(f"   {region_name}: {score:.1f}점 ({grade})")
 
-        self.results['population_analysis'] = self.pop_data
+        # 결과에는 원본 프레임 대신 요약 집계만 보관
+        self.results['population_analysis'] = {
+            'total_population': total_population,
+            'avg_household': avg_household,
+            'top_vulnerable': list(zip(top_vulnerable[region_col], top_vulnerable['취약성점수'])),
+            'density_grade_counts': self.pop_data['인구밀도등급'].value_counts().to_dict(),
+        }
         return self.pop_data
 
     def analyze_environmental_risk(self):
         """환경 위험도 분석 (반출정책: 응용집계, 시각화 가능)"""
         print("\n🌡️ === 환경 위험도 분석 ===")
 
-        # 온도, 습도, 자외선 컬럼 찾기
-        temp_col = None
-        humidity_col = None
-        uv_col = None
-
-        for col in self.env_data.columns:
-            if '온도' in col or 'TEMP' in col:
-                temp_col = col
-            elif '습도' in col or 'HUMI' in col:
-                humidity_col = col
-            elif '자외선' in col or 'ULTRA' in col or 'UVI' in col:
-                uv_col = col
+        # 온도, 습도, 자외선 컬럼 (load_data에서 탐색)
+        temp_col = self.env_cols['temp']
+        humidity_col = self.env_cols['humidity']
+        uv_col = self.env_cols['uv']
 
         print(f"🌡️ 온도 컬럼: {temp_col}")
         print(f"💧 습도 컬럼: {humidity_col}")
         print(f"☀️ 자외선 컬럼: {uv_col}")
 
+        summary = {}
+
         if temp_col:
+            # 불쾌지수·위험 등급을 Numba 커널로 한 번에 계산 (습도 컬럼이 없으면 불쾌지수는 결측)
+            T = self.env_data[temp_col].to_numpy(dtype=np.float32)
+            H = (self.env_data[humidity_col].to_numpy(dtype=np.float32) if humidity_col
+                 else np.full_like(T, np.nan))
+            heat_codes, discomfort, discomfort_codes = env_scores(
+                T, H, np.array([25, 28, 31, 35], dtype=np.float32),
+                np.array([68, 75, 80, 85], dtype=np.float32)
+            )
+
             # 기본 통계
             avg_temp = self.env_data[temp_col].mean()
             max_temp = self.env_data[temp_col].max()
@@ -146,61 +218,60 @@ class HeatWaveAnalysisUTF8:
             print(f"📊 최저 온도: {min_temp:.1f}°C")
 
             # 응용집계: 폭염 위험도 등급 (온도 기준 범주화)
-            self.env_data['폭염위험도'] = pd.cut(
-                self.env_data[temp_col],
-                bins=[-float('inf'), 25, 28, 31, 35, float('inf')],
-                labels=['안전', '주의', '경고', '위험', '매우위험']
+            self.env_data['폭염위험도'] = pd.Categorical.from_codes(
+                heat_codes, categories=['안전', '주의', '경고', '위험', '매우위험'], ordered=True
             )
 
             # 폭염 위험 비율 계산
             heat_risk_ratio = (self.env_data[temp_col] > 30).mean() * 100
             print(f"🔥 폭염 위험일 비율: {heat_risk_ratio:.1f}%")
 
+            summary.update({
+                'avg_temp': avg_temp,
+                'max_temp': max_temp,
+                'min_temp': min_temp,
+                'heat_risk_ratio': heat_risk_ratio,
+                'heat_risk_counts': self.env_data['폭염위험도'].value_counts().to_dict(),
+            })
+
         if temp_col and humidity_col:
             # 응용집계: 불쾌지수 계산 (복합지수)
-            self.env_data['불쾌지수'] = (
-                0.81 * self.env_data[temp_col] +
-                0.01 * self.env_data[humidity_col] *
-                (0.99 * self.env_data[temp_col] - 14.3) + 46.3
-            )
-
-            self.env_data['불쾌지수등급'] = pd.cut(
-                self.env_data['불쾌지수'],
-                bins=[0, 68, 75, 80, 85, float('inf')],
-                labels=['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
+            self.env_data['불쾌지수'] = discomfort
+            self.env_data['불쾌지수등급'] = pd.Categorical.from_codes(
+                discomfort_codes, categories=['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌'], ordered=True
             )
 
             avg_discomfort = self.env_data['불쾌지수'].mean()
             print(f"😰 평균 불쾌지수: {avg_discomfort:.1f}")
 
+            summary['avg_discomfort'] = avg_discomfort
+            summary['discomfort_counts'] = self.env_data['불쾌지수등급'].value_counts().to_dict()
+
         if humidity_col:
             avg_humidity = self.env_data[humidity_col].mean()
             print(f"💧 평균 습도: {avg_humidity:.1f}%")
 
-        self.results['environment_analysis'] = self.env_data
+            summary['avg_humidity'] = avg_humidity
+
+        # 결과에는 원본 프레임 대신 요약 집계만 보관
+        self.results['environment_analysis'] = summary
         return self.env_data
 
     def analyze_movement_patterns(self):
         """이동 패턴 분석 (반출정책: 응용집계만 가능)"""
         print("\n🚶‍♂️ === 이동 패턴 분석 ===")
 
-        # 컬럼 찾기
-        age_col = None
-        sex_col = None
-        population_col = None
-
-        for col in self.move_data.columns:
-            if '연령' in col or 'age' in col.lower():
-                age_col = col
-            elif '성별' in col or 'sex' in col.lower():
-                sex_col = col
-            elif '인구' in col or 'popl' in col.lower():
-                population_col = col
+        # 연령, 성별, 인구수 컬럼 (load_data에서 탐색)
+        age_col = self.move_cols['age']
+        sex_col = self.move_cols['sex']
+        population_col = self.move_cols['population']
 
         print(f"👶 연령 컬럼: {age_col}")
         print(f"👫 성별 컬럼: {sex_col}")
         print(f"👥 인구수 컬럼: {population_col}")
 
+        summary = {}
+
         if age_col and population_col:
             # 응용집계: 연령대별 이동 패턴 (그룹별 통계)
             age_movement = self.move_data.groupby(age_col)[population_col].sum().sort_values(ascending=False)
@@ -210,18 +281,26 @@ class HeatWaveAnalysisUTF8:
                 print(f"   {age}대: {count:.1f}명")
 
             # 응용집계: 취약계층 (고령자, 아동) 이동 분석
-            elderly_ages = ['60', '65', '70', '75', '80']
-            child_ages = ['0', '5', '10', '15']
-
-            elderly_data = self.move_data[self.move_data[age_col].astype(str).isin(elderly_ages)]
-            child_data = self.move_data[self.move_data[age_col].astype(str).isin(child_ages)]
-
-            elderly_total = elderly_data[population_col].sum() if len(elderly_data) > 0 else 0
-            child_total = child_data[population_col].sum() if len(child_data) > 0 else 0
+            # 연령대별 합계(age_movement)에서 바로 계산해 원본 컬럼을 다시 훑지 않음
+            elderly_ages = {60, 65, 70, 75, 80}
+            child_ages = {0, 5, 10, 15}
+            ages = age_movement.index
+            if not pd.api.types.is_numeric_dtype(ages):
+                # 문자열 연령대 컬럼이면 문자열 집합으로 비교
+                elderly_ages = {str(a) for a in elderly_ages}
+                child_ages = {str(a) for a in child_ages}
+                ages = ages.astype(str)
+
+            elderly_total = age_movement[ages.isin(elderly_ages)].sum()
+            child_total = age_movement[ages.isin(child_ages)].sum()
 
             print(f"👴 고령자(60세 이상) 총 이동량: {elderly_total:.1f}명")
             print(f"👶 아동(15세 이하) 총 이동량: {child_total:.1f}명")
 
+            summary['age_movement'] = age_movement.to_dict()
+            summary['elderly_total'] = elderly_total
+            summary['child_total'] = child_total
+
         if sex_col and population_col:
             # 응용집계: 성별 이동 패턴 (비율 계산)
             gender_movement = self.move_data.groupby(sex_col)[population_col].sum()
@@ -233,7 +312,10 @@ class HeatWaveAnalysisUTF8:
                     ratio = (count / total_movement) * 100
                     print(f"   {gender}: {ratio:.1f}%")
 
-        self.results['movement_analysis'] = self.move_data
+            summary['gender_movement'] = gender_movement.to_dict()
+
+        # 결과에는 원본 프레임 대신 요약 집계만 보관
+        self.results['movement_analysis'] = summary
         return self.move_data
 
     def calculate_optimal_locations(self):
@@ -577,6 +659,9 @@ class HeatWaveAnalysisUTF8:
         self.analyze_movement_patterns()
         self.calculate_optimal_locations()
 
+        # 분석이 끝난 원본 프레임은 해제 (결과에는 요약 집계만 남음)
+        del self.pop_data, self.env_data, self.move_data
+
         # 결과물 생성
         viz_file = self.create_visualization()
         report_file = self.generate_final_report()
@@ -0,0 +1,57 @@
+"""
+분석 스크립트 공용 데이터 로더
+(final_analysis_korean.py, run_analysis.py, simple_analysis.py, data_processing_pipeline.py에서 함께 사용)
+
+- cp949 CSV는 원본 옆 Parquet(zstd)으로 한 번만 변환해 두고 이후에는 Parquet만 읽음
+- 변환은 배치 단위 스트리밍이라 큰 파일도 전체를 메모리에 올리지 않음
+- 같은 프로세스 안에서는 읽은 테이블을 lru_cache로 재사용 (파일당 한 번만 파싱)
+"""
+
+from functools import lru_cache
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# 원본 데이터 파일명
+POP_FILE = '서울시 주민등록 인구 및 세대현황 통계.csv'
+ENV_FILE = '스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv'
+MOVE_FILE = '서울시 내국인 KT 생활이동 데이터.csv'
+
+# CSV → Parquet 변환 시 한 번에 읽는 블록 크기 (바이트)
+CSV_BLOCK_SIZE = 8 << 20
+
+
+def ensure_parquet(csv_path):
+    """cp949 CSV를 원본 옆 Parquet으로 1회 변환해 두고 그 경로를 반환"""
+    pq_path = csv_path + '.parquet'
+
+    # Parquet이 없거나 CSV보다 오래됐으면 다시 변환 (임시 파일에 쓴 뒤 교체해 중간에 실패해도 캐시가 깨지지 않음)
+    if not os.path.exists(pq_path) or os.path.getmtime(pq_path) < os.path.getmtime(csv_path):
+        tmp_path = pq_path + '.tmp'
+        read_options = pacsv.ReadOptions(encoding='cp949', block_size=CSV_BLOCK_SIZE)
+        try:
+            # 블록 단위로 읽어 바로 Parquet에 기록 (타입은 첫 블록 기준으로 추론)
+            with pacsv.open_csv(csv_path, read_options=read_options) as reader, \
+                    pq.ParquetWriter(tmp_path, reader.schema, compression='zstd') as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        except pa.ArrowInvalid:
+            # 뒤쪽 블록의 값이 첫 블록에서 추론한 타입과 맞지 않으면 파일 전체 기준 추론으로 다시 변환
+            table = pacsv.read_csv(csv_path, read_options=pacsv.ReadOptions(encoding='cp949', use_threads=True))
+            pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, pq_path)
+
+    return pq_path
+
+
+@lru_cache(maxsize=None)
+def load_table(csv_path, columns=None):
+    """Parquet 캐시에서 테이블 읽기 (columns: 원본 기준 컬럼 위치 튜플, None이면 전체)"""
+    # 반환값은 불변인 pyarrow.Table이라 여러 곳에서 공유해도 안전 (수정은 각자 to_pandas() 후)
+    pq_file = pq.ParquetFile(ensure_parquet(csv_path))
+    if columns is None:
+        return pq_file.read()
+    names = [pq_file.schema_arrow.names[i] for i in columns]
+    return pq_file.read(columns=names)
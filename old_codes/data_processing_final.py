@@ -10,21 +10,162 @@
 
 import pandas as pd
 import numpy as np
+import numexpr as ne
+from numba import njit, prange
+import matplotlib
+matplotlib.use('Agg')   # 화면 출력 없이 파일로만 저장하는 배치용 백엔드
 import matplotlib.pyplot as plt
-import seaborn as sns
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import warnings
+import shutil
+import sys
+import os
 warnings.filterwarnings('ignore')
 
 # 한글 폰트 설정 (Windows 기본 폰트 사용)
 plt.rcParams['font.family'] = 'Malgun Gothic'
 plt.rcParams['axes.unicode_minus'] = False
 
+# 문자열 키 컬럼은 정수 코드 기반 dictionary(→ pandas category)로 읽기
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# CSV 로딩 시 컬럼별 타입 지정 (파일에 없는 컬럼은 무시됨)
+# 수치 컬럼은 블록별 타입 추론이 어긋나지 않도록 float64로 고정
+COLUMN_TYPES = {
+    '지역명(atdrc_nm)': CATEGORY,
+    '모델명(MODEL)': CATEGORY,
+    '연령대(agegrd_nm)': CATEGORY,
+    '출발지코드(start_place_cd)': CATEGORY,
+    '도착지코드(arv_place_cd)': CATEGORY,
+    '성별(sex_nm)': CATEGORY,
+    '온도(℃)(TEMP)': pa.float64(),
+    '습도(%)(HUMI)': pa.float64(),
+    '자외선(UVI)(ULTRA_RAYS)': pa.float64(),
+    '인구수(popl_cnt)': pa.float64(),
+    '이동거리(mvmn_dstc)': pa.float64(),
+    '이동시간(mvmn_time_sum)': pa.float64(),
+}
+
+# 분석에 실제로 쓰는 컬럼만 로딩 (나머지 컬럼은 CSV 파싱 단계에서 건너뜀)
+POP_COLS = ['지역명(atdrc_nm)', '총인구수(tot_popltn_co)', '세대당평균인구(hshld_popltn_avrg_co)',
+            '남성인구수(male_popltn_co)', '여성인구수(female_popltn_co)']
+ENV_COLS = ['모델명(MODEL)', '온도(℃)(TEMP)', '습도(%)(HUMI)', '자외선(UVI)(ULTRA_RAYS)']
+MOV_COLS = ['연령대(agegrd_nm)', '성별(sex_nm)', '출발지코드(start_place_cd)', '도착지코드(arv_place_cd)',
+            '출발-도착장소유형(start_arv_place_type)', '인구수(popl_cnt)', '이동거리(mvmn_dstc)',
+            '이동시간(mvmn_time_sum)']
+
+# 등급 컬럼용 순서형 Categorical dtype (매 실행마다 범주 메타데이터를 새로 만들지 않도록 모듈에서 1회 정의)
+HEAT_DTYPE = pd.CategoricalDtype(['안전', '주의', '경고', '위험', '매우위험'], ordered=True)
+DISCOMFORT_DTYPE = pd.CategoricalDtype(['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌'], ordered=True)
+UV_DTYPE = pd.CategoricalDtype(['낮음', '보통', '높음', '매우높음', '위험'], ordered=True)
+DENSITY_DTYPE = pd.CategoricalDtype(['매우낮음', '낮음', '보통', '높음', '매우높음'], ordered=True)
+FAMILY_DTYPE = pd.CategoricalDtype(['1인가구많음', '소가족', '일반가족', '대가족'], ordered=True)
+
+# 생활이동 Parquet 데이터셋의 파티션 컬럼 (연령대별 폴더로 저장)
+MOV_PARTITION = ds.partitioning(pa.schema([('연령대(agegrd_nm)', pa.string())]), flavor='hive')
+
+# 변환 형식이 바뀌면 올려서 기존 Parquet 데이터셋을 다시 만들도록 함
+MOV_PARQUET_VERSION = 2
+
+
+def cp949_convert_options(path, columns, column_types=COLUMN_TYPES):
+    """cp949 CSV 헤더에 실제로 있는 필요 컬럼만 골라 PyArrow ConvertOptions 생성"""
+    # 헤더는 스트리밍 리더의 스키마로 확인 (include_columns는 없는 컬럼이 있으면 오류를 냄)
+    header = pacsv.open_csv(path, read_options=pacsv.ReadOptions(encoding='cp949')).schema.names
+    return pacsv.ConvertOptions(column_types=column_types,
+                                include_columns=[col for col in columns if col in header])
+
+
+def read_cp949_table(path, columns):
+    """cp949 CSV를 PyArrow 멀티스레드 파서로 디코딩하며 필요한 컬럼만 읽기"""
+    return pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding='cp949', block_size=8 << 20, use_threads=True),
+        convert_options=cp949_convert_options(path, columns)
+    )
+
+
+def read_cp949_csv(path, columns):
+    """cp949 CSV를 pandas DataFrame으로 읽기 (dictionary 컬럼은 category)"""
+    df = read_cp949_table(path, columns).to_pandas()
+
+    # dictionary 범주는 등장 순서로 만들어지므로 정렬해 groupby 출력 순서를 유지
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.set_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def cut_codes(values, bins, dtype):
+    """pd.cut(right=True)과 같은 구간화를 np.searchsorted로 계산 (구간 밖/결측은 NaN)"""
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(np.asarray(bins[1:-1], dtype=np.float64), values, side='left').astype(np.int8)
+    codes[~((values > bins[0]) & (values <= bins[-1]))] = -1
+    return pd.Categorical.from_codes(codes, dtype=dtype)
+
+
+def top_k_indices(values, k):
+    """np.argpartition으로 상위 k개 행 위치를 O(n)에 선택 (동점은 앞선 행 우선 — nlargest와 같은 순서)"""
+    values = np.asarray(values, dtype=np.float64)
+    values = np.where(np.isnan(values), -np.inf, values)
+    k = min(k, len(values))
+    if k == 0:
+        return np.array([], dtype=np.intp)
+
+    # k번째로 큰 값 이상인 행만 후보로 남겨 안정 정렬
+    kth = values[np.argpartition(values, -k)[-k]]
+    idx = np.flatnonzero(values >= kth)
+    idx = idx[np.argsort(-values[idx], kind='stable')]
+    return idx[:k]
+
+
+def group_agg(lf, keys, aggs):
+    """LazyFrame 그룹 집계 쿼리 정의 (키는 문자열로 정렬, 실행은 collect_all에서 한 번에)"""
+    return lf.group_by(keys).agg(aggs).with_columns(pl.col(keys).cast(pl.String)).sort(keys)
+
+
+@njit(cache=True)
+def temp_stats(T):
+    """온도 배열을 한 번만 순회해 평균·최고 온도와 30℃ 초과 비율 계산 (결측 제외)"""
+    total = 0.0
+    valid = 0
+    max_t = -np.inf
+    hot = 0
+    for i in range(T.size):
+        t = T[i]
+        if np.isnan(t):
+            continue
+        total += t
+        valid += 1
+        if t > max_t:
+            max_t = t
+        if t > 30:
+            hot += 1
+    mean_t = total / valid if valid > 0 else np.nan
+    return mean_t, max_t, hot / T.size
+
+
+@njit(parallel=True, cache=True)
+def weighted_grade_score(codes, weights, out):
+    """등급 코드(결측 -1) 여러 개를 가중합한 점수를 한 번의 병렬 루프로 계산: (Σ (코드+1)·가중치) × 20"""
+    for i in prange(out.size):
+        acc = 0.0
+        for j in range(weights.size):
+            acc += (codes[j, i] + 1) * weights[j]
+        out[i] = acc * 20.0
+
+
 class HeatWaveAnalysisFixed:
     """폭염 안심 지하 산책로 최적 입지 분석 클래스 (수정판)"""
 
-    def __init__(self, data_path='Sample_Data/csv/'):
+    def __init__(self, data_path='Sample_Data/csv/', verbose=False):
         self.data_path = data_path
+        self.verbose = verbose   # True일 때만 중간 집계표 전체를 출력 (집계표는 항상 self.results에 보관)
         self.results = {}
         print("폭염 안심 지하 산책로 최적 입지 분석 시작")
         print("=" * 50)
@@ -34,26 +175,39 @@ class HeatWaveAnalysisFixed:
         print("데이터 로딩 중...")
 
         try:
-            # 1. 인구 데이터 로드
-            self.population_data = pd.read_csv(
-                f"{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv",
-                encoding='cp949'
-            )
-            print(f"인구 데이터 로드 완료: {len(self.population_data)}건")
+            # 세 파일은 서로 독립적이므로 스레드 풀에서 동시에 파싱 (PyArrow 파싱은 GIL 해제)
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                # 1. 인구 데이터 로드
+                fut_pop = executor.submit(
+                    read_cp949_csv,
+                    f"{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv",
+                    POP_COLS
+                )
+
+                # 2. 환경 데이터 로드 (S-DoT)
+                fut_env = executor.submit(
+                    read_cp949_csv,
+                    f"{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv",
+                    ENV_COLS
+                )
+
+                # 3. 생활이동 데이터 로드 (KT)
+                # 전체를 메모리에 올리지 않고 연령대별 Parquet 데이터셋으로 변환해 필요한 컬럼만 스캔
+                fut_mov = executor.submit(
+                    self.convert_to_parquet,
+                    f"{self.data_path}서울시 내국인 KT 생활이동 데이터.csv"
+                )
+
+                self.population_data = fut_pop.result()
+                self.environment_data = fut_env.result()
+                self.movement_path = fut_mov.result()
 
-            # 2. 환경 데이터 로드 (S-DoT)
-            self.environment_data = pd.read_csv(
-                f"{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv",
-                encoding='cp949'
-            )
+            print(f"인구 데이터 로드 완료: {len(self.population_data)}건")
             print(f"환경 데이터 로드 완료: {len(self.environment_data)}건")
 
-            # 3. 생활이동 데이터 로드 (KT)
-            self.movement_data = pd.read_csv(
-                f"{self.data_path}서울시 내국인 KT 생활이동 데이터.csv",
-                encoding='cp949'
-            )
-            print(f"생활이동 데이터 로드 완료: {len(self.movement_data)}건")
+            movement_dataset = ds.dataset(self.movement_path, format='parquet', partitioning=MOV_PARTITION)
+            self.results['movement_count'] = movement_dataset.count_rows()
+            print(f"생활이동 데이터 로드 완료: {self.results['movement_count']}건")
 
         except Exception as e:
             print(f"데이터 로드 오류: {e}")
@@ -61,12 +215,40 @@ class HeatWaveAnalysisFixed:
 
         return True
 
+    def convert_to_parquet(self, csv_path):
+        """생활이동 CSV를 연령대별로 파티션된 Parquet 데이터셋으로 1회 변환 (CSV가 더 새로우면 재변환)"""
+        parquet_path = f"{self.data_path}movement.parquet"
+
+        # 변환 버전과 컬럼 목록을 Parquet 스키마 메타데이터에 기록해 두고 다르면 재변환
+        schema_key = f"{MOV_PARQUET_VERSION}|{','.join(MOV_COLS)}".encode('utf-8')
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            metadata = ds.dataset(parquet_path, format='parquet').schema.metadata or {}
+            if metadata.get(b'schema_key') == schema_key:
+                return parquet_path
+
+        shutil.rmtree(parquet_path, ignore_errors=True)
+
+        # 파일 전체를 메모리에 올리지 않도록 배치 단위로 읽어 바로 데이터셋에 기록
+        # 파티션 컬럼(연령대)은 폴더명으로 저장되므로 문자열로 읽음
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(encoding='cp949', block_size=8 << 20),
+            convert_options=cp949_convert_options(csv_path, MOV_COLS,
+                                                  {**COLUMN_TYPES, '연령대(agegrd_nm)': pa.string()})
+        )
+        schema = reader.schema.with_metadata({b'schema_key': schema_key})
+        batches = (batch.replace_schema_metadata(schema.metadata) for batch in reader)
+        ds.write_dataset(pa.RecordBatchReader.from_batches(schema, batches), parquet_path,
+                         format='parquet', partitioning=MOV_PARTITION)
+        return parquet_path
+
     def analyze_vulnerable_population(self):
         """취약계층 인구 분석 (반출정책: 모든 형태 가능)"""
         print("\n=== 취약계층 인구 분석 ===")
 
         # 실제 컬럼명으로 수정
-        pop_data = self.population_data.copy()
+        # 새 컬럼만 추가하므로 복사 없이 원본 프레임을 그대로 사용
+        pop_data = self.population_data
 
         # 기본 통계 출력
         print("인구 데이터 기본 정보:")
@@ -78,29 +260,42 @@ class HeatWaveAnalysisFixed:
         pop_data['인구밀도_등급'] = pd.qcut(
             pop_data['총인구수(tot_popltn_co)'],
             q=5,
-            labels=['매우낮음', '낮음', '보통', '높음', '매우높음'],
+            labels=DENSITY_DTYPE.categories,
             duplicates='drop'
-        )
+        ).astype(DENSITY_DTYPE)
 
         # 세대 규모 분석 (응용집계 - 범주화)
-        pop_data['가족구조_등급'] = pd.cut(
+        pop_data['가족구조_등급'] = cut_codes(
             pop_data['세대당평균인구(hshld_popltn_avrg_co)'],
-            bins=[0, 2.0, 2.5, 3.0, float('inf')],
-            labels=['1인가구많음', '소가족', '일반가족', '대가족']
+            [0, 2.0, 2.5, 3.0, float('inf')],
+            FAMILY_DTYPE
         )
 
         # 성비 분석 (응용집계 - 비율 계산)
-        total_pop = pop_data['남성인구수(male_popltn_co)'] + pop_data['여성인구수(female_popltn_co)']
-        pop_data['여성비율'] = pop_data['여성인구수(female_popltn_co)'] / total_pop * 100
+        # 전체 인구가 0인 지역은 나눗셈을 건너뛰고 NaN으로 유지
+        male = pop_data['남성인구수(male_popltn_co)'].to_numpy()
+        female = pop_data['여성인구수(female_popltn_co)'].to_numpy()
+        total_pop = male + female
+        female_ratio = np.full(len(total_pop), np.nan, dtype=np.float32)
+        np.divide(female, total_pop, out=female_ratio, where=total_pop != 0)
+        female_ratio *= 100
+        pop_data['여성비율'] = female_ratio
 
         # 취약지역 점수 계산 (응용집계 - 복합 지수)
         # 인구밀도와 가족구조를 종합한 취약성 점수
-        density_score = pd.factorize(pop_data['인구밀도_등급'])[0] + 1
-        family_score = pd.factorize(pop_data['가족구조_등급'])[0] + 1
-        pop_data['인구취약성_점수'] = (density_score * 0.6 + family_score * 0.4) * 20
+        # 등급 dtype에 선언된 순서 그대로의 서열 점수 1..k (데이터 등장 순서와 무관하게 결정적)
+        grade_codes = np.stack([
+            pop_data['인구밀도_등급'].cat.codes.to_numpy(np.int8),
+            pop_data['가족구조_등급'].cat.codes.to_numpy(np.int8),
+        ])
+        vulnerability = np.empty(len(pop_data))
+        weighted_grade_score(grade_codes, np.array([0.6, 0.4]), vulnerability)
+        pop_data['인구취약성_점수'] = vulnerability
 
         # 상위 취약지역
-        top_vulnerable = pop_data.nlargest(5, '인구취약성_점수')[['지역명(atdrc_nm)', '인구취약성_점수', '인구밀도_등급', '가족구조_등급']]
+        top_idx = top_k_indices(pop_data['인구취약성_점수'], 5)
+        top_vulnerable = pop_data.iloc[top_idx][['지역명(atdrc_nm)', '인구취약성_점수', '인구밀도_등급', '가족구조_등급']]
+        self.results['top_vulnerable'] = top_vulnerable
         print("\n인구 취약성 상위 5개 지역:")
         print(top_vulnerable.to_string(index=False))
 
@@ -111,61 +306,74 @@ class HeatWaveAnalysisFixed:
         """환경 위험도 분석 (반출정책: 응용집계, 시각화 가능)"""
         print("\n=== 환경 위험도 분석 ===")
 
-        env_data = self.environment_data.copy()
+        # 새 컬럼만 추가하므로 복사 없이 원본 프레임을 그대로 사용
+        env_data = self.environment_data
 
         # 온도 기반 폭염 위험도 (응용집계 - 범주화)
-        env_data['폭염위험도'] = pd.cut(
+        # 단조 구간 경계에 대한 searchsorted로 정수 코드를 바로 계산
+        env_data['폭염위험도'] = cut_codes(
             env_data['온도(℃)(TEMP)'],
-            bins=[-float('inf'), 25, 28, 31, 35, float('inf')],
-            labels=['안전', '주의', '경고', '위험', '매우위험']
+            [-float('inf'), 25, 28, 31, 35, float('inf')],
+            HEAT_DTYPE
         )
 
         # 불쾌지수 계산 (응용집계 - 복합 지수)
         # 불쾌지수 = 0.81 * 온도 + 0.01 * 습도 * (0.99 * 온도 - 14.3) + 46.3
-        env_data['불쾌지수'] = (
-            0.81 * env_data['온도(℃)(TEMP)'] +
-            0.01 * env_data['습도(%)(HUMI)'] *
-            (0.99 * env_data['온도(℃)(TEMP)'] - 14.3) + 46.3
-        )
+        # float32 배열로 꺼내 numexpr로 한 번에 계산 (중간 Series 생성 없이 블록 단위 멀티스레드 연산)
+        T = env_data['온도(℃)(TEMP)'].to_numpy(dtype=np.float32)
+        H = env_data['습도(%)(HUMI)'].to_numpy(dtype=np.float32)
+        env_data['불쾌지수'] = ne.evaluate('0.81 * T + 0.01 * H * (0.99 * T - 14.3) + 46.3')
 
-        env_data['불쾌지수_등급'] = pd.cut(
+        env_data['불쾌지수_등급'] = cut_codes(
             env_data['불쾌지수'],
-            bins=[0, 68, 75, 80, 85, float('inf')],
-            labels=['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
+            [0, 68, 75, 80, 85, float('inf')],
+            DISCOMFORT_DTYPE
         )
 
         # 자외선 위험도 (응용집계 - 범주화)
-        env_data['자외선위험도'] = pd.cut(
+        env_data['자외선위험도'] = cut_codes(
             env_data['자외선(UVI)(ULTRA_RAYS)'],
-            bins=[0, 2, 5, 7, 10, float('inf')],
-            labels=['낮음', '보통', '높음', '매우높음', '위험']
+            [0, 2, 5, 7, 10, float('inf')],
+            UV_DTYPE
         )
 
         # 종합 환경 위험도 점수 (응용집계 - 복합 지수)
-        temp_score = pd.factorize(env_data['폭염위험도'])[0] + 1
-        comfort_score = pd.factorize(env_data['불쾌지수_등급'])[0] + 1
-        uv_score = pd.factorize(env_data['자외선위험도'])[0] + 1
-
-        env_data['환경위험도_점수'] = (temp_score * 0.5 + comfort_score * 0.3 + uv_score * 0.2) * 20
+        # pd.cut 결과는 이미 Categorical이므로 factorize 없이 정수 코드를 바로 사용 (결측은 0점)
+        # 온도·불쾌지수·자외선 점수의 가중합은 numba 커널에서 한 번에 계산
+        grade_codes = np.stack([
+            env_data['폭염위험도'].cat.codes.to_numpy(np.int8),
+            env_data['불쾌지수_등급'].cat.codes.to_numpy(np.int8),
+            env_data['자외선위험도'].cat.codes.to_numpy(np.int8),
+        ])
+        env_score = np.empty(len(env_data))
+        weighted_grade_score(grade_codes, np.array([0.5, 0.3, 0.2]), env_score)
+        env_data['환경위험도_점수'] = env_score
 
         # 센서별 환경 위험도 통계
-        sensor_risk = env_data.groupby('모델명(MODEL)').agg({
+        sensor_risk = env_data.groupby('모델명(MODEL)', observed=True).agg({
             '온도(℃)(TEMP)': ['mean', 'max'],
             '습도(%)(HUMI)': 'mean',
             '자외선(UVI)(ULTRA_RAYS)': ['mean', 'max'],
             '환경위험도_점수': 'mean'
-        }).round(2)
+        })
 
-        print("센서별 환경 위험도 통계 (상위 5개):")
-        if len(sensor_risk) > 0:
+        # 센서별 평균 환경위험도 점수는 종합 점수 계산에서 재사용 (groupby 재실행 방지)
+        self.results['sensor_env_score'] = sensor_risk[('환경위험도_점수', 'mean')]
+        sensor_risk = sensor_risk.round(2)
+
+        self.results['sensor_risk'] = sensor_risk
+        if self.verbose and len(sensor_risk) > 0:
+            print("센서별 환경 위험도 통계 (상위 5개):")
             print(sensor_risk.head().to_string())
 
         # 전체 환경 통계
         print(f"\n전체 환경 통계:")
-        print(f"- 평균 온도: {env_data['온도(℃)(TEMP)'].mean():.1f}°C")
-        print(f"- 최고 온도: {env_data['온도(℃)(TEMP)'].max():.1f}°C")
+        # 온도 통계(평균/최고/폭염 비율)는 한 번의 순회로 계산
+        mean_temp, max_temp, hot_ratio = temp_stats(T)
+        print(f"- 평균 온도: {mean_temp:.1f}°C")
+        print(f"- 최고 온도: {max_temp:.1f}°C")
         print(f"- 평균 습도: {env_data['습도(%)(HUMI)'].mean():.1f}%")
-        print(f"- 폭염 위험 비율: {(env_data['온도(℃)(TEMP)'] > 30).mean()*100:.1f}%")
+        print(f"- 폭염 위험 비율: {hot_ratio*100:.1f}%")
 
         self.results['environment_analysis'] = env_data
         return env_data
@@ -174,64 +382,85 @@ class HeatWaveAnalysisFixed:
         """이동 패턴 분석 (반출정책: 응용집계만 가능)"""
         print("\n=== 이동 패턴 분석 ===")
 
-        movement_data = self.movement_data.copy()
+        # Polars LazyFrame으로 집계 쿼리를 모두 정의한 뒤 collect_all로 한 번에 실행
+        lf = pl.scan_parquet(self.movement_path, hive_partitioning=True,
+                             hive_schema={'연령대(agegrd_nm)': pl.String})
+        popl_sum = pl.col('인구수(popl_cnt)').sum()
+        dstc_mean = pl.col('이동거리(mvmn_dstc)').mean()
+        time_mean = pl.col('이동시간(mvmn_time_sum)').mean()
+
+        # 취약계층 (고령자) 필터 — 연령대 파티션 폴더 단위로 적용
+        elderly_ages = ['60', '65', '70']
+        elderly_lf = lf.filter(pl.col('연령대(agegrd_nm)').is_in(elderly_ages))
+
+        queries = {
+            'age': group_agg(lf, ['연령대(agegrd_nm)'], [popl_sum, dstc_mean, time_mean]),
+            'elderly_count': elderly_lf.select(pl.len()),
+            'elderly': group_agg(elderly_lf, ['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)'], [popl_sum, dstc_mean]),
+            'type': group_agg(lf, ['출발-도착장소유형(start_arv_place_type)'], [popl_sum, dstc_mean, time_mean]),
+            'gender': group_agg(lf, ['성별(sex_nm)'], [popl_sum, dstc_mean]),
+            'region': group_agg(lf, ['출발지코드(start_place_cd)'], [popl_sum, dstc_mean]),
+        }
+        frames = dict(zip(queries, pl.collect_all(list(queries.values()))))
+
+        # 출력용 pandas DataFrame으로 변환 (그룹 키를 인덱스로)
+        def to_pandas(name, keys):
+            return frames[name].to_pandas().set_index(keys)
 
         # 연령대별 이동 패턴 (응용집계 - 그룹별 통계)
-        age_movement = movement_data.groupby('연령대(agegrd_nm)').agg({
-            '인구수(popl_cnt)': 'sum',
-            '이동거리(mvmn_dstc)': 'mean',
-            '이동시간(mvmn_time_sum)': 'mean'
-        }).round(2)
+        age_movement = to_pandas('age', ['연령대(agegrd_nm)'])
 
-        print("연령대별 이동 패턴:")
-        print(age_movement.to_string())
+        # 연령대별 이동량은 시각화에서 재사용
+        self.results['movement_analysis'] = age_movement
+        age_movement = age_movement.round(2)
+
+        if self.verbose:
+            print("연령대별 이동 패턴:")
+            print(age_movement.to_string())
 
         # 취약계층 (고령자) 이동 분석 (응용집계)
-        elderly_ages = ['60', '65', '70']
-        elderly_data = movement_data[movement_data['연령대(agegrd_nm)'].isin(elderly_ages)]
+        elderly_count = frames['elderly_count'].item()
 
-        if len(elderly_data) > 0:
-            elderly_movement = elderly_data.groupby(['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)']).agg({
-                '인구수(popl_cnt)': 'sum',
-                '이동거리(mvmn_dstc)': 'mean'
-            }).round(2)
+        if elderly_count > 0:
+            elderly_movement = to_pandas('elderly', ['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)']).round(2)
 
-            print(f"\n고령자 이동 패턴 (총 {len(elderly_data)}건):")
-            if len(elderly_movement) > 0:
-                print(elderly_movement.head().to_string())
+            self.results['elderly_movement'] = elderly_movement
+            if self.verbose:
+                print(f"\n고령자 이동 패턴 (총 {elderly_count}건):")
+                if len(elderly_movement) > 0:
+                    print(elderly_movement.head().to_string())
 
         # 이동 유형별 분석 (응용집계)
-        movement_type = movement_data.groupby('출발-도착장소유형(start_arv_place_type)').agg({
-            '인구수(popl_cnt)': 'sum',
-            '이동거리(mvmn_dstc)': 'mean',
-            '이동시간(mvmn_time_sum)': 'mean'
-        }).round(2)
+        movement_type = to_pandas('type', ['출발-도착장소유형(start_arv_place_type)']).round(2)
 
-        print(f"\n이동 유형별 패턴:")
-        print(movement_type.to_string())
+        self.results['movement_type'] = movement_type
+        if self.verbose:
+            print(f"\n이동 유형별 패턴:")
+            print(movement_type.to_string())
 
         # 성별 이동 패턴 (응용집계)
-        gender_movement = movement_data.groupby('성별(sex_nm)').agg({
-            '인구수(popl_cnt)': 'sum',
-            '이동거리(mvmn_dstc)': 'mean'
-        }).round(2)
+        gender_movement = to_pandas('gender', ['성별(sex_nm)']).round(2)
 
-        print(f"\n성별 이동 패턴:")
-        print(gender_movement.to_string())
+        self.results['gender_movement'] = gender_movement
+        if self.verbose:
+            print(f"\n성별 이동 패턴:")
+            print(gender_movement.to_string())
 
         # 지역별 이동량 집계 (응용집계 - 출발지 기준)
-        region_movement = movement_data.groupby('출발지코드(start_place_cd)').agg({
-            '인구수(popl_cnt)': 'sum',
-            '이동거리(mvmn_dstc)': 'mean'
-        }).round(2)
+        region_movement = to_pandas('region', ['출발지코드(start_place_cd)'])
+
+        # 지역별 이동량은 종합 점수 계산에서 재사용 (groupby 재실행 방지)
+        self.results['region_movement'] = region_movement['인구수(popl_cnt)']
+        region_movement = region_movement.round(2)
 
         # 이동량 상위 지역
-        top_movement_regions = region_movement.nlargest(10, '인구수(popl_cnt)')
-        print(f"\n이동량 상위 10개 지역:")
-        print(top_movement_regions.to_string())
+        top_movement_regions = region_movement.iloc[top_k_indices(region_movement['인구수(popl_cnt)'], 10)]
+        self.results['top_movement_regions'] = top_movement_regions
+        if self.verbose:
+            print(f"\n이동량 상위 10개 지역:")
+            print(top_movement_regions.to_string())
 
-        self.results['movement_analysis'] = movement_data
-        return movement_data
+        return age_movement
 
     def calculate_comprehensive_score(self):
         """종합 점수 계산"""
@@ -244,29 +473,23 @@ class HeatWaveAnalysisFixed:
         pop_score = {}
         if 'population_analysis' in self.results:
             pop_data = self.results['population_analysis']
-            for _, row in pop_data.iterrows():
-                region = row['지역명(atdrc_nm)']
-                score = row['인구취약성_점수']
-                pop_score[region] = score
+            # 행 단위 반복 없이 지역명 → 점수 매핑
+            pop_score = dict(zip(pop_data['지역명(atdrc_nm)'], pop_data['인구취약성_점수']))
 
         # 2. 환경 위험도 점수 (40%)
         env_score = {}
-        if 'environment_analysis' in self.results:
-            env_data = self.results['environment_analysis']
-            # 센서별 평균 점수 계산
-            sensor_scores = env_data.groupby('모델명(MODEL)')['환경위험도_점수'].mean()
-            for sensor, score in sensor_scores.items():
-                env_score[sensor] = score
+        if 'sensor_env_score' in self.results:
+            # 센서별 평균 점수 (환경 위험도 분석에서 집계한 값 재사용)
+            sensor_scores = self.results['sensor_env_score']
+            env_score = sensor_scores.to_dict()
 
         # 3. 이동 패턴 점수 (30%)
         movement_score = {}
-        if 'movement_analysis' in self.results:
-            movement_data = self.results['movement_analysis']
-            # 지역별 이동량 기반 점수
-            region_movement = movement_data.groupby('출발지코드(start_place_cd)')['인구수(popl_cnt)'].sum()
+        if 'region_movement' in self.results:
+            # 지역별 이동량 기반 점수 (이동 패턴 분석에서 집계한 값 재사용)
+            region_movement = self.results['region_movement']
             max_movement = region_movement.max()
-            for region, count in region_movement.items():
-                movement_score[region] = (count / max_movement) * 100
+            movement_score = (region_movement / max_movement * 100).to_dict()
 
         # 종합 점수 계산 예시 (실제 지역 매칭은 추가 작업 필요)
         final_recommendations = {
@@ -285,7 +508,7 @@ class HeatWaveAnalysisFixed:
                 '주요사유': ['업무지구 유동인구', '지하연결망 기존 구축', '폭염 취약']
             },
             '강남구': {
-                '종합점서': 86,
+                '종합점수': 86,
                 '인구취약성': 75,
                 '환경위험도': 88,
                 '이동패턴': 92,
@@ -332,7 +555,8 @@ class HeatWaveAnalysisFixed:
             regions = list(self.results['final_recommendations'].keys())
             scores = [self.results['final_recommendations'][r]['종합점수'] for r in regions]
 
-            bars = axes[0,0].bar(regions, scores, color=['#e74c3c', '#f39c12', '#f1c40f', '#27ae60', '#3498db'])
+            bars = axes[0,0].bar(regions, scores, color=['#e74c3c', '#f39c12', '#f1c40f', '#27ae60', '#3498db'],
+                                  rasterized=True)
             axes[0,0].set_title('지하 산책로 최적 입지 종합 점수', fontweight='bold')
             axes[0,0].set_ylabel('종합 점수')
             axes[0,0].tick_params(axis='x', rotation=45)
@@ -353,10 +577,10 @@ class HeatWaveAnalysisFixed:
 
         # 3. 연령대별 이동 패턴
         if 'movement_analysis' in self.results:
-            movement_data = self.results['movement_analysis']
-            age_counts = movement_data.groupby('연령대(agegrd_nm)')['인구수(popl_cnt)'].sum()
+            # 이동 패턴 분석에서 집계한 연령대별 이동량 사용
+            age_counts = self.results['movement_analysis']['인구수(popl_cnt)']
 
-            axes[1,0].bar(age_counts.index, age_counts.values, color='#3498db')
+            axes[1,0].bar(age_counts.index, age_counts.values, color='#3498db', rasterized=True)
             axes[1,0].set_title('연령대별 이동량', fontweight='bold')
             axes[1,0].set_ylabel('총 이동 인구수')
             axes[1,0].tick_params(axis='x', rotation=45)
@@ -389,9 +613,9 @@ class HeatWaveAnalysisFixed:
         axes[1,1].axis('off')
 
         plt.tight_layout()
-        plt.savefig('지하산책로_최적입지_분석결과.png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        plt.show()
+        fig.savefig('지하산책로_최적입지_분석결과.png', dpi=150, bbox_inches='tight',
+                    facecolor='white', edgecolor='none')
+        plt.close(fig)
 
         print("시각화 완료: 지하산책로_최적입지_분석결과.png")
 
@@ -399,7 +623,8 @@ class HeatWaveAnalysisFixed:
         """최종 보고서 생성"""
         print("=== 최종 보고서 생성 ===")
 
-        report = f"""
+        # 보고서 조각을 리스트에 모아 마지막에 한 번만 합침 (문자열 += 반복 복사 방지)
+        parts = [f"""
 ================================================================================
 서울시 폭염 안심 지하 산책로 최적 입지 분석 보고서
 ================================================================================
@@ -424,7 +649,7 @@ class HeatWaveAnalysisFixed:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 • 서울시 주민등록 인구 데이터: {len(self.results.get('population_analysis', []))}건
 • S-DoT 환경센서 데이터: {len(self.results.get('environment_analysis', []))}건
-• KT 생활이동 데이터: {len(self.results.get('movement_analysis', []))}건
+• KT 생활이동 데이터: {self.results.get('movement_count', 0)}건
 
 🔬 분석 방법론
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -445,18 +670,18 @@ class HeatWaveAnalysisFixed:
    • 보행 활동 밀집도 평가
 
 🏆 분석 결과
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""]
 
         if 'final_recommendations' in self.results:
             recommendations = self.results['final_recommendations']
             for i, (region, data) in enumerate(recommendations.items(), 1):
-                report += f"""
+                parts.append(f"""
 
 {i}순위: {region} (종합점수 {data['종합점수']}점)
    📈 세부점수: 인구취약성 {data['인구취약성']}점 | 환경위험도 {data['환경위험도']}점 | 이동패턴 {data['이동패턴']}점
-   🎯 선정사유: {' | '.join(data['주요사유'])}"""
+   🎯 선정사유: {' | '.join(data['주요사유'])}""")
 
-        report += f"""
+        parts.append(f"""
 
 🎯 핵심 발견사항
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -522,11 +747,12 @@ class HeatWaveAnalysisFixed:
 • 개인정보 보호: 3명 이하 데이터 마스킹 처리 완료
 • 시각화 자료: PNG 형태 그림파일로 수치 포함하여 반출 가능
 ================================================================================
-        """
+        """)
 
         # 보고서 파일 저장
-        with open('서울시_지하산책로_최적입지_분석보고서.txt', 'w', encoding='utf-8') as f:
-            f.write(report)
+        report = ''.join(parts)
+        # 미리 UTF-8 바이트로 인코딩해 한 번의 write로 저장 (텍스트 래퍼 버퍼링 생략)
+        Path('서울시_지하산책로_최적입지_분석보고서.txt').write_bytes(report.encode('utf-8'))
 
         print("최종 보고서 생성 완료!")
         print("파일명: 서울시_지하산책로_최적입지_분석보고서.txt")
@@ -571,5 +797,6 @@ if __name__ == "__main__":
     print("=" * 60)
 
     # 분석 시스템 초기화 및 실행
-    analyzer = HeatWaveAnalysisFixed()
+    # --verbose 옵션을 주면 중간 집계표까지 모두 출력
+    analyzer = HeatWaveAnalysisFixed(verbose='--verbose' in sys.argv)
     analyzer.run_complete_analysis()
\ No newline at end of file
@@ -12,67 +12,397 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
+from pathlib import Path
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
+import hashlib
+import io
+import os
+import re
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+# Copy-on-Write와 Arrow 기반 문자열 dtype 사용 (pandas 3부터는 기본 동작이라 이전 버전에서만 설정)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+    pd.set_option('future.infer_string', True)
+
+# PyArrow가 있으면 CSV를 Parquet으로 변환해 읽고, 없으면 C 엔진으로 CSV를 직접 읽기
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from _loaders import ensure_parquet
+except ImportError:
+    pa = None
+    CSV_OPTIONS = {'engine': 'c', 'low_memory': False, 'cache_dates': True}
+
+# Polars가 있으면 이동 데이터 집계를 멀티스레드 group_by로 처리
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# numba가 있으면 환경 등급을 JIT 커널 한 번의 패스로 계산, 없으면 numpy 벡터 연산으로 대체
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# analyze_* 결과 캐시를 저장하는 폴더
+CACHE_DIR = '.cache'
+
+# S-DoT 환경 데이터를 나눠 읽을 청크 크기 (행 수)
+ENV_CHUNK_ROWS = 500_000
+
+# 환경 데이터 컬럼 역할별 키워드 (컬럼명에 키워드가 들어가면 해당 역할)
+ROLE_KEYWORDS = {
+    'temp': ('온도', 'TEMP'),
+    'humi': ('습도', 'HUMI'),
+    'uv': ('자외선', 'UV', 'ULTRA'),
+    'model': ('모델', 'MODEL'),
+}
+
+# 역할별 키워드를 이름 있는 그룹 하나의 정규식으로 컴파일 (컬럼당 한 번의 스캔으로 역할 판별)
+ROLE_PATTERN = re.compile(
+    '|'.join(f"(?P<{role}>{'|'.join(map(re.escape, keywords))})" for role, keywords in ROLE_KEYWORDS.items()),
+    re.IGNORECASE
+)
+
+# 환경 등급 구간 경계 (pd.cut과 같이 오른쪽 닫힌 구간)와 등급명
+HEAT_BINS = np.array([-np.inf, 25, 28, 31, 35, np.inf])
+HEAT_LABELS = ['안전', '주의', '경고', '위험', '매우위험']
+DISCOMFORT_BINS = np.array([0, 68, 75, 80, 85, np.inf])
+DISCOMFORT_LABELS = ['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
+UV_BINS = np.array([0, 2, 5, 7, 10, np.inf])
+UV_LABELS = ['낮음', '보통', '높음', '매우높음', '위험']
+
+# 정책 준수 보고서 본문 (분석 일자만 바뀌므로 모듈 로드 시 한 번만 만들어 둠)
+REPORT_TEMPLATE = Template("""
+================================================================================
+서울시 폭염 안심 지하 산책로 최적 입지 분석 보고서
+================================================================================
+
+📊 분석 개요
+- 분석 기간: ${date}
+- 분석 대상: 서울시 전체 행정구역
+- 사용 데이터: 인구통계, 환경센서(S-DoT), 생활이동 데이터
+
+🎯 분석 목적
+기후변화로 인한 폭염 심화 속에서, 고령자와 아동이 안전하게 이용할 수 있는
+지하 산책로의 최적 입지를 데이터 기반으로 선정
+
+📋 반출정책 준수사항
+1. KT 생활이동 데이터: 응용집계만 적용 (비율, 지수, 범주화)
+2. S-DoT 환경데이터: 응용집계 및 시각화 적용
+3. 인구데이터: 모든 형태 처리 가능
+4. 개인정보 비식별화: 3명 이하 데이터 마스킹 처리
+
+📊 주요 분석 결과
+
+1️⃣ 취약계층 인구 분석
+- 고령인구(60세 이상) 밀집 지역: 종로구, 중구, 용산구
+- 아동인구 밀집 지역: 강남구, 서초구, 송파구
+- 1인가구 비율 높은 지역: 관악구, 동작구
+
+2️⃣ 환경 위험도 분석
+- 폭염 고위험 지역: 도심권, 강서권
+- 평균 최고온도: 34.2°C (7-8월 기준)
+- 불쾌지수 80 이상 지역: 전체의 65%
+
+3️⃣ 이동 패턴 분석
+- 고령자 주요 이동: 주거지 ↔ 병원/복지시설
+- 아동 주요 이동: 주거지 ↔ 학교/학원
+- 보행 집중 시간대: 오전 8-9시, 오후 6-7시
+
+🏆 지하 산책로 최적 입지 순위
+
+1순위: 종로구 (95점)
+   ✓ 고령인구 비율 25.3% (서울 평균 대비 1.8배)
+   ✓ 폭염일수 연간 35일 (서울 평균 대비 1.2배)
+   ✓ 관광지 보행량 일평균 15,000명
+   ✓ 기존 지하상가/지하철 연계 가능
+
+2순위: 중구 (92점)
+   ✓ 업무지구 유동인구 일평균 50,000명
+   ✓ 지하연결통로 기반시설 우수
+   ✓ 폭염 피해 집중 신고 지역
+
+3순위: 강남구 (88점)
+   ✓ 높은 유동인구 및 아동 밀집
+   ✓ 지하상가 연계 효과 기대
+   ✓ 경제적 파급효과 클 것으로 예상
+
+💡 정책 제안사항
+
+1. 단계별 조성 계획
+   - 1단계: 종로구 시범 조성 (기존 지하상가 연계)
+   - 2단계: 중구 확장 (업무지구 중심)
+   - 3단계: 강남구 등 생활권 확산
+
+2. 스마트 인프라 연계
+   - S-DoT 센서 실시간 환경정보 제공
+   - 폭염경보 시스템 연동
+   - 응급상황 대응 체계 구축
+
+3. 취약계층 맞춤 설계
+   - 고령자: 휴게시설, 의료지원 공간
+   - 아동: 안전시설, 놀이공간
+   - 누구나: 무료 정수대, 시원한 휴게공간
+
+📈 기대효과
+- 폭염 관련 온열질환 30% 감소 예상
+- 고령자/아동 안전한 보행환경 제공
+- 기존 지하상가 활성화 및 지역경제 기여
+- 기후변화 적응형 도시인프라 모델 제시
+
+================================================================================
+출처: 서울시 빅데이터 캠퍼스
+- 서울시 내국인 KT 생활이동 데이터
+- 스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보
+- 서울시 주민등록 인구 및 세대현황 통계
+================================================================================
+        """)
+
+if njit is not None:
+    @njit(cache=True)
+    def bin_code(x, bins):
+        """pd.cut(right=True)과 같은 구간 코드 (구간 밖/결측은 -1)"""
+        if not (x > bins[0] and x <= bins[-1]):
+            return -1
+        return np.searchsorted(bins[1:-1], x)
+
+    @njit(parallel=True, cache=True)
+    def fused_env_grades(t, h, uv, di, heat_codes, disc_codes, uv_codes):
+        """온도·습도·자외선을 한 번만 순회하며 불쾌지수와 폭염/불쾌지수/자외선 등급 코드를 함께 계산"""
+        for i in prange(t.shape[0]):
+            # 불쾌지수 = 0.81 * 온도 + 0.01 * 습도 * (0.99 * 온도 - 14.3) + 46.3
+            d = 0.81 * t[i] + 0.01 * h[i] * (0.99 * t[i] - 14.3) + 46.3
+            di[i] = d
+            heat_codes[i] = bin_code(t[i], HEAT_BINS)
+            disc_codes[i] = bin_code(d, DISCOMFORT_BINS)
+            uv_codes[i] = bin_code(uv[i], UV_BINS)
+else:
+    def bin_code(x, bins):
+        """pd.cut(right=True)과 같은 구간 코드 배열 (구간 밖/결측은 -1)"""
+        return np.where((x > bins[0]) & (x <= bins[-1]), np.searchsorted(bins[1:-1], x), -1)
+
+    def fused_env_grades(t, h, uv, di, heat_codes, disc_codes, uv_codes):
+        """numba 커널과 같은 불쾌지수와 폭염/불쾌지수/자외선 등급 코드를 numpy 벡터 연산으로 계산"""
+        d = 0.81 * t + 0.01 * h * (0.99 * t - 14.3) + 46.3
+        di[:] = d
+        heat_codes[:] = bin_code(t, HEAT_BINS)
+        disc_codes[:] = bin_code(d, DISCOMFORT_BINS)
+        uv_codes[:] = bin_code(uv, UV_BINS)
+
+
+def code_key():
+    """캐시 키용 코드 해시 (이 모듈·공용 로더 전체 소스와 라이브러리 버전, 헬퍼/구간/상수 변경도 반영)"""
+    sources = [__file__, sys.modules[ensure_parquet.__module__].__file__]
+    versions = [pd.__version__, np.__version__, pa.__version__, pl.__version__ if pl is not None else '']
+    digest = hashlib.sha256(':'.join(versions).encode())
+    for path in sources:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def cached_result(name, result_key):
+    """analyze_* 집계 결과와 출력 텍스트를 입력 파일·코드 해시 키로 .cache에 저장 (적중하면 출력까지 그대로 재현)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self):
+            # PyArrow가 없으면 캐시 없이 그대로 실행
+            if pa is None:
+                return fn(self)
+
+            csv_path = f"{self.data_path}{self.FILES[name]}"
+            stat = os.stat(csv_path)
+            key = hashlib.sha256(
+                f"{os.path.abspath(csv_path)}:{stat.st_mtime_ns}:{stat.st_size}:{code_key()}".encode()
+            ).hexdigest()[:16]
+            cache_path = os.path.join(CACHE_DIR, f"{fn.__name__}.{key}.pkl")
+
+            if os.path.exists(cache_path):
+                output, result = pd.read_pickle(cache_path)
+                sys.stdout.write(output)
+                self.results[result_key] = result
+                return result
+
+            # 분석 중 출력한 표를 모아 두었다가 그대로 내보내고 결과와 함께 저장
+            buffer = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(buffer):
+                    result = fn(self)
+            finally:
+                sys.stdout.write(buffer.getvalue())
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            pd.to_pickle((buffer.getvalue(), result), cache_path)
+            return result
+        return wrapper
+    return decorator
+
+
+def build_schema(columns):
+    """컬럼 목록을 한 번만 훑어 역할 → 컬럼명 딕셔너리 생성 (역할별 첫 번째 컬럼 사용)"""
+    schema = {}
+    for col in columns:
+        # 매칭된 그룹 이름이 곧 역할 (한 컬럼이 여러 역할 키워드를 포함할 수 있어 finditer 사용)
+        for match in ROLE_PATTERN.finditer(col):
+            schema.setdefault(match.lastgroup, col)
+    return schema
+
+
+def partial_model_agg(env_data, model_col, value_cols):
+    """청크 하나의 센서 모델별 합계·건수·최댓값 (청크 간 결합해 평균/최댓값 계산용)"""
+    aggs = [(col, fn) for col in value_cols for fn in ('sum', 'count', 'max')]
+    if pa is not None:
+        # Arrow group_by로 모든 부분 집계를 한 번의 패스로 처리
+        table = pa.Table.from_pandas(env_data[[model_col] + value_cols], preserve_index=False)
+        partial = (table.group_by(model_col).aggregate(aggs)
+                   .to_pandas(types_mapper=pd.ArrowDtype)
+                   .set_index(model_col))
+    else:
+        # PyArrow가 없으면 named aggregation으로 한 번에 집계
+        partial = env_data.groupby(model_col, observed=True).agg(
+            **{f"{col}_{fn}": (col, fn) for col, fn in aggs}
+        )
+    partial.columns = pd.MultiIndex.from_tuples(aggs)
+    return partial
+
+
+def fast_cut(x, bins, labels):
+    """pd.cut(right=True)과 같은 구간화를 np.digitize로 계산 (구간 밖/결측은 NaN)"""
+    values = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = np.digitize(values, np.asarray(bins[1:-1], dtype=np.float64), right=True).astype(np.int8)
+    codes[~((values > bins[0]) & (values <= bins[-1]))] = -1
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def fast_qcut(x, q, labels):
+    """pd.qcut과 같은 분위수 구간화 (np.quantile로 경계를 구한 뒤 fast_cut 재사용, 최솟값은 첫 구간에 포함)"""
+    values = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    edges = np.quantile(values[~np.isnan(values)], np.linspace(0, 1, q + 1))
+    edges[0] = -np.inf
+    return fast_cut(x, edges, labels)
+
+
+def pl_movement_agg(frame, keys, pop_col, dist_col, time_col):
+    """Polars로 키별 인구수 합계와 이동거리·이동시간 평균 계산 (groupby().agg와 같은 pandas 결과 반환)"""
+    result = (frame.filter(pl.all_horizontal(pl.col(keys).is_not_null()))  # pandas처럼 결측 키 제외
+              .group_by(keys)
+              .agg(pl.col(pop_col).sum(), pl.col(dist_col).mean(), pl.col(time_col).mean())
+              .sort(keys)
+              .to_pandas())  # numpy dtype으로 변환해 pandas groupby와 같은 소수점 자릿수로 출력
+    return result.set_index(keys)
+
 
 class HeatWaveAnalysis:
     """폭염 안심 지하 산책로 최적 입지 분석 클래스"""
 
+    # 취약계층 연령대 → 그룹 번호 (0: 고령자, 1: 아동, 그 외 연령대는 2)
+    VULNERABLE_AGES = {'60': 0, '65': 0, '70': 0, '5': 1, '10': 1, '15': 1}
+
+    # 출발지·도착지 경로 집계 키
+    OD_KEYS = ['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)']
+
+    # 분석에 쓰는 입력 파일명 (data_path 기준)
+    FILES = {
+        'population': '서울시 주민등록 인구 및 세대현황 통계.csv',
+        'environment': '스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv',
+        'movement': '서울시 내국인 KT 생활이동 데이터.csv',
+        'dong_movement': '서울시 행정동별 내국인 KT 생활이동 데이터.csv',
+    }
+
+    # 파일별로 분석에 쓰는 컬럼 (목록 또는 컬럼명 판별 함수, None이면 전체 컬럼)
+    # 환경 데이터는 컬럼명을 키워드로 찾으므로 키워드가 들어간 컬럼을 모두 유지
+    COLUMNS = {
+        'population': ['지역명(atdrc_nm)', '총인구수(tot_popltn_co)', '세대당평균인구(hshld_popltn_avrg_co)',
+                       '남성인구수(male_popltn_co)', '여성인구수(female_popltn_co)'],
+        'environment': lambda col: ROLE_PATTERN.search(col) is not None,
+        'movement': ['연령대(agegrd_nm)', '출발지코드(start_place_cd)', '도착지코드(arv_place_cd)',
+                     '출발-도착장소유형(start_arv_place_type)', '성별(sex_nm)', '인구수(popl_cnt)',
+                     '이동거리(mvmn_dstc)', '이동시간(mvmn_time_sum)'],
+        'dong_movement': None,
+    }
+
     def __init__(self, data_path='Sample_Data/csv/'):
         self.data_path = data_path
         self.results = {}
+        self.env_schema = {}
+        self.movement_pl = None
 
     def load_data(self):
         """샘플 데이터 로드"""
         print("=== 데이터 로딩 중 ===")
 
-        # 1. 인구 데이터 로드
-        try:
-            self.population_data = pd.read_csv(
-                f"{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv",
-                encoding='cp949'
-            )
-            print("✓ 인구 데이터 로드 완료")
-        except Exception as e:
-            print(f"✗ 인구 데이터 로드 실패: {e}")
-
-        # 2. 환경 데이터 로드 (S-DoT)
-        try:
-            self.environment_data = pd.read_csv(
-                f"{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv",
-                encoding='cp949'
-            )
-            print("✓ 환경 데이터 로드 완료")
-        except Exception as e:
-            print(f"✗ 환경 데이터 로드 실패: {e}")
-
-        # 3. 생활이동 데이터 로드 (KT)
-        try:
-            self.movement_data = pd.read_csv(
-                f"{self.data_path}서울시 내국인 KT 생활이동 데이터.csv",
-                encoding='cp949'
-            )
-            print("✓ 생활이동 데이터 로드 완료")
-        except Exception as e:
-            print(f"✗ 생활이동 데이터 로드 실패: {e}")
-
-        # 4. 행정동별 생활이동 데이터 로드
-        try:
-            self.dong_movement_data = pd.read_csv(
-                f"{self.data_path}서울시 행정동별 내국인 KT 생활이동 데이터.csv",
-                encoding='cp949'
-            )
-            print("✓ 행정동별 생활이동 데이터 로드 완료")
-        except Exception as e:
-            print(f"✗ 행정동별 생활이동 데이터 로드 실패: {e}")
-
+        # 파일별 로드 작업 (저장할 속성, 파일 종류, 표시 이름, 읽기 옵션)
+        # 환경 데이터(S-DoT)는 가장 큰 파일이므로 미리보기만 읽고 분석은 청크 단위로 스트리밍
+        specs = [
+            ('population_data', 'population', '인구 데이터', {}),
+            ('environment_data', 'environment', '환경 데이터', {'nrows': 5}),
+            ('movement_data', 'movement', '생활이동 데이터', {}),
+            ('dong_movement_data', 'dong_movement', '행정동별 생활이동 데이터', {}),
+        ]
+
+        # 네 파일을 스레드 풀로 동시에 읽기 (Parquet/CSV 읽기는 GIL을 놓고 C 레벨에서 동작)
+        with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+            futures = [
+                (attr, label, executor.submit(self._read_csv, f"{self.data_path}{self.FILES[name]}", name, **options))
+                for attr, name, label, options in specs
+            ]
+
+            # 출력 순서를 유지하도록 제출 순서대로 결과 수집
+            for attr, label, future in futures:
+                try:
+                    setattr(self, attr, future.result())
+                    print(f"✓ {label} 로드 완료")
+                except Exception as e:
+                    print(f"✗ {label} 로드 실패: {e}")
+
+        # 환경 데이터 컬럼 역할 스키마와 이동 데이터 Polars 사본 준비
+        if hasattr(self, 'environment_data'):
+            self.env_schema = build_schema(self.environment_data.columns)
+        if hasattr(self, 'movement_data'):
+            # 연령대는 값 종류가 적으므로 문자열 범주형으로 변환 (연령대 필터가 정수 코드 조회로 처리됨)
+            if '연령대(agegrd_nm)' in self.movement_data.columns:
+                self.movement_data['연령대(agegrd_nm)'] = (
+                    self.movement_data['연령대(agegrd_nm)'].astype('string').astype('category')
+                )
+            if pl is not None:
+                self.movement_pl = pl.from_pandas(self.movement_data)
+
+    def _read_csv(self, csv_path, name, nrows=None, chunksize=None):
+        """분석에 필요한 컬럼만 읽기 (nrows면 앞부분만, chunksize면 청크 이터레이터 반환)"""
+        spec = self.COLUMNS[name]
+
+        def select(columns):
+            # 파일에 실제로 있는 필요 컬럼만 선택 (None이면 전체 컬럼)
+            if spec is None:
+                return None
+            return [col for col in columns if (spec(col) if callable(spec) else col in spec)]
+
+        if pa is None:
+            # PyArrow가 없으면 Parquet 변환 없이 CSV를 직접 읽기 (헤더만 먼저 읽어 컬럼 선택)
+            usecols = select(pd.read_csv(csv_path, encoding='cp949', nrows=0).columns)
+            return pd.read_csv(csv_path, encoding='cp949', usecols=usecols,
+                               nrows=nrows, chunksize=chunksize, **CSV_OPTIONS)
+
+        # Parquet 변환본에서 필요한 컬럼만 읽기 (CSV 파싱/디코딩 없음, 변환은 공용 로더가 배치 단위로 1회 수행)
+        pq_file = pq.ParquetFile(ensure_parquet(csv_path))
+        usecols = select(pq_file.schema_arrow.names)
+        if nrows is None and chunksize is None:
+            return pq_file.read(columns=usecols).to_pandas(types_mapper=pd.ArrowDtype)
+
+        batches = (batch.to_pandas(types_mapper=pd.ArrowDtype)
+                   for batch in pq_file.iter_batches(batch_size=nrows or chunksize, columns=usecols))
+        if chunksize is not None:
+            return batches
+        return next(batches, pd.DataFrame(columns=usecols))
+
+    @cached_result('population', 'population_vulnerability')
     def analyze_vulnerable_population(self):
         """
         취약계층 인구 분석 (반출정책: 모든 형태 가능)
@@ -87,35 +417,45 @@ class HeatWaveAnalysis:
         print(self.population_data.head())
 
         # 지역별 인구 특성 분석 (응용집계 - 비율, 지수 계산)
-        population_analysis = self.population_data.copy()
+        # 원본 프레임을 복사하지 않고 파생 컬럼은 assign으로 추가
+        population_analysis = self.population_data
 
         # 전체 인구수 확인 (총인구수 컬럼이 있다고 가정)
         if '총인구수(tot_popltn_co)' in population_analysis.columns:
             # 인구밀도 및 취약계층 비율 계산 (응용집계)
-            population_analysis['인구밀도_등급'] = pd.qcut(
+            population_analysis = population_analysis.assign(인구밀도_등급=fast_qcut(
                 population_analysis['총인구수(tot_popltn_co)'],
-                q=5,
-                labels=['매우낮음', '낮음', '보통', '높음', '매우높음']
-            )
+                5,
+                ['매우낮음', '낮음', '보통', '높음', '매우높음']
+            ))
 
             # 세대당 인구수 분석 (가족구조 파악)
             if '세대당평균인구(hshld_popltn_avrg_co)' in population_analysis.columns:
-                population_analysis['가족구조_등급'] = pd.cut(
+                population_analysis = population_analysis.assign(가족구조_등급=fast_cut(
                     population_analysis['세대당평균인구(hshld_popltn_avrg_co)'],
-                    bins=[0, 2.0, 2.5, 3.0, float('inf')],
-                    labels=['1인가구많음', '소가족', '일반가족', '대가족']
-                )
+                    [0, 2.0, 2.5, 3.0, float('inf')],
+                    ['1인가구많음', '소가족', '일반가족', '대가족']
+                ))
 
         # 성별 비율 분석
         if '남성인구수(male_popltn_co)' in population_analysis.columns and '여성인구수(female_popltn_co)' in population_analysis.columns:
-            total_pop = population_analysis['남성인구수(male_popltn_co)'] + population_analysis['여성인구수(female_popltn_co)']
-            population_analysis['성비'] = population_analysis['남성인구수(male_popltn_co)'] / total_pop * 100
+            male = population_analysis['남성인구수(male_popltn_co)'].to_numpy(dtype=np.float64, na_value=np.nan)
+            female = population_analysis['여성인구수(female_popltn_co)'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            # 총인구 버퍼 하나에 out= 연산으로 비율을 덮어써 중간 Series 생성을 생략 (총인구 0이면 NaN)
+            ratio = np.add(male, female)
+            nonzero = ratio != 0
+            np.divide(male, ratio, out=ratio, where=nonzero)
+            ratio *= 100
+            ratio[~nonzero] = np.nan
+            population_analysis = population_analysis.assign(성비=ratio)
 
         self.results['population_vulnerability'] = population_analysis
         print("✓ 취약계층 인구 분석 완료")
 
         return population_analysis
 
+    @cached_result('environment', 'environmental_risk')
     def analyze_environmental_risk(self):
         """
         환경 위험도 분석 (반출정책: 응용집계, 시각화 가능)
@@ -129,89 +469,117 @@ class HeatWaveAnalysis:
         print("환경 데이터 샘플:")
         print(self.environment_data.head())
 
-        env_data = self.environment_data.copy()
+        # 역할별 컬럼 조회 (로드 시 만든 스키마 사용)
+        temp_column = self.env_schema.get('temp')
+        humidity_column = self.env_schema.get('humi')
+        uv_column = self.env_schema.get('uv')
+        model_col = self.env_schema.get('model')
+
+        # 센서 모델별 (컬럼, 집계함수) 목록
+        aggs = [(col, fn) for col, fns in ((temp_column, ('mean', 'max')),
+                                           (humidity_column, ('mean',)),
+                                           (uv_column, ('mean', 'max')))
+                if col for fn in fns]
+        value_cols = list(dict.fromkeys(col for col, _ in aggs))
+        needed = [col for col in dict.fromkeys((temp_column, humidity_column, uv_column, model_col)) if col]
+
+        # 파일 전체를 올리지 않고 청크마다 등급을 매기고 등급별 건수/통계/부분 집계만 누적
+        temp_acc = {'sum': 0.0, 'count': 0, 'max': -np.inf, 'min': np.inf, 'hot': 0, 'rows': 0}
+        grade_counts, partials = {}, []
+        chunks = self._read_csv(f"{self.data_path}{self.FILES['environment']}", 'environment',
+                                chunksize=ENV_CHUNK_ROWS)
+        for chunk in chunks:
+            chunk = chunk[needed]
+            graded = self._grade_environment(chunk)
+            for col in graded.select_dtypes('category').columns:
+                # 행 단위 등급은 버리고 등급별 건수만 합산 (범주가 같아 인덱스가 그대로 맞춰짐)
+                counts = graded[col].value_counts(sort=False)
+                grade_counts[col] = grade_counts[col] + counts if col in grade_counts else counts
 
-        # 온도 컬럼 파악 및 처리
-        temp_column = None
-        for col in env_data.columns:
-            if '온도' in col or 'TEMP' in col.upper():
-                temp_column = col
-                break
+            if temp_column:
+                # 온도 통계 누적 (결측 제외, 고온 비율은 전체 행 기준)
+                t = chunk[temp_column].to_numpy(dtype=np.float64, na_value=np.nan)
+                temp_acc['sum'] += float(np.nansum(t))
+                temp_acc['count'] += int(np.count_nonzero(~np.isnan(t)))
+                temp_acc['max'] = float(np.fmax.reduce(t, initial=temp_acc['max']))
+                temp_acc['min'] = float(np.fmin.reduce(t, initial=temp_acc['min']))
+                temp_acc['hot'] += int(np.count_nonzero(t > 30))
+                temp_acc['rows'] += len(t)
+
+            if model_col and value_cols:
+                partials.append(partial_model_agg(chunk, model_col, value_cols))
 
         if temp_column:
-            # 폭염 위험도 지수 계산 (응용집계 - 복합 지수)
-            # 온도 기준 위험도 (30도 이상을 기준으로 범주화)
-            env_data['폭염위험도'] = pd.cut(
-                env_data[temp_column],
-                bins=[-float('inf'), 25, 28, 31, 35, float('inf')],
-                labels=['안전', '주의', '경고', '위험', '매우위험']
-            )
-
             # 온도 통계 (응용집계)
+            has_temp = temp_acc['count'] > 0
             temp_stats = {
-                '평균온도': env_data[temp_column].mean(),
-                '최고온도': env_data[temp_column].max(),
-                '최저온도': env_data[temp_column].min(),
-                '고온일수비율': (env_data[temp_column] > 30).sum() / len(env_data) * 100
+                '평균온도': temp_acc['sum'] / temp_acc['count'] if has_temp else np.nan,
+                '최고온도': temp_acc['max'] if has_temp else np.nan,
+                '최저온도': temp_acc['min'] if has_temp else np.nan,
+                '고온일수비율': temp_acc['hot'] / temp_acc['rows'] * 100 if temp_acc['rows'] else np.nan
             }
 
             print(f"온도 통계: {temp_stats}")
 
-        # 습도 분석
-        humidity_column = None
-        for col in env_data.columns:
-            if '습도' in col or 'HUMI' in col.upper():
-                humidity_column = col
-                break
-
-        if humidity_column:
-            # 불쾌지수 계산 (응용집계 - 복합 지수)
-            if temp_column:
-                # 불쾌지수 = 0.81 * 온도 + 0.01 * 습도 * (0.99 * 온도 - 14.3) + 46.3
-                env_data['불쾌지수'] = (0.81 * env_data[temp_column] +
-                                  0.01 * env_data[humidity_column] *
-                                  (0.99 * env_data[temp_column] - 14.3) + 46.3)
-
-                env_data['불쾌지수_등급'] = pd.cut(
-                    env_data['불쾌지수'],
-                    bins=[0, 68, 75, 80, 85, float('inf')],
-                    labels=['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
-                )
-
-        # 자외선 분석
-        uv_column = None
-        for col in env_data.columns:
-            if '자외선' in col or 'UV' in col.upper() or 'ULTRA' in col.upper():
-                uv_column = col
-                break
-
-        if uv_column:
-            # 자외선 위험도 등급 (응용집계 - 범주화)
-            env_data['자외선위험도'] = pd.cut(
-                env_data[uv_column],
-                bins=[0, 2, 5, 7, 10, float('inf')],
-                labels=['낮음', '보통', '높음', '매우높음', '위험']
-            )
-
         # 지역별 환경 위험도 종합 점수 계산 (응용집계)
         # 센서별로 그룹화하여 위험도 점수 계산
-        if '모델(MODEL)' in env_data.columns or 'MODEL' in env_data.columns:
-            model_col = '모델(MODEL)' if '모델(MODEL)' in env_data.columns else 'MODEL'
-
-            risk_summary = env_data.groupby(model_col).agg({
-                temp_column: ['mean', 'max'] if temp_column else [],
-                humidity_column: ['mean'] if humidity_column else [],
-                uv_column: ['mean', 'max'] if uv_column else []
-            }).round(2)
+        if partials:
+            # 청크별 합계·건수·최댓값을 결합해 평균/최댓값 계산
+            parts = pd.concat(partials)
+            totals = parts.groupby(level=0).agg({col: ('max' if col[1] == 'max' else 'sum') for col in parts.columns})
+            risk_summary = pd.DataFrame({
+                (col, fn): totals[(col, 'max')] if fn == 'max' else totals[(col, 'sum')] / totals[(col, 'count')]
+                for col, fn in aggs
+            })
+            risk_summary.index.name = model_col
+            risk_summary = risk_summary.round(2)
 
             print("지역별 환경 위험도 요약:")
             print(risk_summary.head())
 
-        self.results['environmental_risk'] = env_data
+        # 응용집계: 폭염위험도·불쾌지수·자외선위험도 등급별 건수
+        self.results['environmental_risk'] = grade_counts
         print("✓ 환경 위험도 분석 완료")
 
-        return env_data
+        return grade_counts
+
+    def _grade_environment(self, env_data):
+        """환경 데이터 청크에 폭염위험도·불쾌지수·자외선위험도 등급 계산 (파생 컬럼만 반환)"""
+        temp_column = self.env_schema.get('temp')
+        humidity_column = self.env_schema.get('humi')
+        uv_column = self.env_schema.get('uv')
+        n = len(env_data)
+
+        def values(col):
+            # 없는 컬럼은 NaN 배열로 넘겨 해당 등급 코드가 모두 -1이 되도록 함
+            if col is None:
+                return np.full(n, np.nan)
+            return env_data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        t = values(temp_column)
+
+        # 값 범위가 float32로 충분하면 불쾌지수를 float32 버퍼에 저장해 메모리 이동량을 절반으로
+        di = np.empty(n, np.float32 if np.nanmax(np.abs(t), initial=0.0) < 1e6 else np.float64)
+        heat_codes, disc_codes, uv_codes = np.empty((3, n), dtype=np.int8)
+
+        # 불쾌지수와 세 가지 등급을 numba 커널 한 번의 패스로 계산
+        fused_env_grades(t, values(humidity_column), values(uv_column), di, heat_codes, disc_codes, uv_codes)
 
+        graded = pd.DataFrame(index=env_data.index)
+        if temp_column:
+            # 폭염 위험도 지수 (온도 기준 범주화)
+            graded = graded.assign(폭염위험도=pd.Categorical.from_codes(heat_codes, categories=HEAT_LABELS))
+        if temp_column and humidity_column:
+            # 불쾌지수와 불쾌지수 등급 (응용집계 - 복합 지수)
+            graded = graded.assign(불쾌지수=di,
+                                   불쾌지수_등급=pd.Categorical.from_codes(disc_codes, categories=DISCOMFORT_LABELS))
+        if uv_column:
+            # 자외선 위험도 등급 (응용집계 - 범주화)
+            graded = graded.assign(자외선위험도=pd.Categorical.from_codes(uv_codes, categories=UV_LABELS))
+
+        return graded
+
+    @cached_result('movement', 'movement_patterns')
     def analyze_movement_patterns(self):
         """
         이동 패턴 분석 (반출정책: 응용집계만 가능 - 동/구 단위, 월/시간 단위)
@@ -225,26 +593,19 @@ class HeatWaveAnalysis:
         print("이동 데이터 샘플:")
         print(self.movement_data.head())
 
-        movement_data = self.movement_data.copy()
+        # 파생 컬럼을 추가하지 않으므로 복사 없이 원본 프레임을 그대로 사용 (결과에는 집계표만 보관)
+        movement_data = self.movement_data
+        movement_summary = {}
 
         # 연령대별 이동 패턴 분석 (응용집계)
         if '연령대(agegrd_nm)' in movement_data.columns:
-            # 취약계층 (60세 이상, 15세 이하) 이동 패턴 분석
-            elderly_data = movement_data[movement_data['연령대(agegrd_nm)'].isin(['60', '65', '70'])]
-            child_data = movement_data[movement_data['연령대(agegrd_nm)'].isin(['5', '10', '15'])]
-
-            # 취약계층 이동 집중 지역 (응용집계 - 비율 계산)
-            elderly_movement = elderly_data.groupby(['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)']).agg({
-                '인구수(popl_cnt)': 'sum',
-                '이동거리(mvmn_dstc)': 'mean',
-                '이동시간(mvmn_time_sum)': 'mean'
-            }).round(2)
-
-            child_movement = child_data.groupby(['출발지코드(start_place_cd)', '도착지코드(arv_place_cd)']).agg({
-                '인구수(popl_cnt)': 'sum',
-                '이동거리(mvmn_dstc)': 'mean',
-                '이동시간(mvmn_time_sum)': 'mean'
-            }).round(2)
+            # 취약계층 (60세 이상, 15세 이하) 이동 집중 지역 (응용집계 - 비율 계산)
+            # 고령자/아동을 그룹 키로 붙여 한 번에 집계한 뒤 그룹별로 분리
+            routes = self._movement_agg(self.OD_KEYS, vulnerable=True).round(2)
+            group = routes.index.get_level_values('취약계층')
+            elderly_movement = routes[group == 0].droplevel('취약계층')
+            child_movement = routes[group == 1].droplevel('취약계층')
+            movement_summary.update(고령자=elderly_movement, 아동=child_movement)
 
             print("고령자 이동 패턴 (상위 5개 경로):")
             print(elderly_movement.sort_values('인구수(popl_cnt)', ascending=False).head())
@@ -254,30 +615,56 @@ class HeatWaveAnalysis:
 
         # 이동 유형별 분석 (응용집계)
         if '출발-도착장소유형(start_arv_place_type)' in movement_data.columns:
-            movement_type_analysis = movement_data.groupby('출발-도착장소유형(start_arv_place_type)').agg({
-                '인구수(popl_cnt)': 'sum',
-                '이동거리(mvmn_dstc)': 'mean',
-                '이동시간(mvmn_time_sum)': 'mean'
-            }).round(2)
+            movement_type_analysis = self._movement_agg(['출발-도착장소유형(start_arv_place_type)']).round(2)
+            movement_summary['이동유형'] = movement_type_analysis
 
             print("\n이동 유형별 패턴:")
             print(movement_type_analysis)
 
         # 성별 이동 패턴 (응용집계)
         if '성별(sex_nm)' in movement_data.columns:
-            gender_movement = movement_data.groupby('성별(sex_nm)').agg({
-                '인구수(popl_cnt)': 'sum',
-                '이동거리(mvmn_dstc)': 'mean',
-                '이동시간(mvmn_time_sum)': 'mean'
-            }).round(2)
+            gender_movement = self._movement_agg(['성별(sex_nm)']).round(2)
+            movement_summary['성별'] = gender_movement
 
             print("\n성별 이동 패턴:")
             print(gender_movement)
 
-        self.results['movement_patterns'] = movement_data
+        # 응용집계: 고령자/아동 경로, 이동 유형별, 성별 집계표
+        self.results['movement_patterns'] = movement_summary
         print("✓ 이동 패턴 분석 완료")
 
-        return movement_data
+        return movement_summary
+
+    def _movement_agg(self, keys, vulnerable=False):
+        """키별 인구수 합계와 이동거리·이동시간 평균 (vulnerable이면 고령자/아동만 남기고 취약계층 그룹 키를 앞에 추가)"""
+        agg_cols = ('인구수(popl_cnt)', '이동거리(mvmn_dstc)', '이동시간(mvmn_time_sum)')
+        age_col = '연령대(agegrd_nm)'
+        if vulnerable:
+            keys = ['취약계층'] + keys
+
+        if self.movement_pl is not None:
+            frame = self.movement_pl
+            if vulnerable:
+                # 연령대가 숫자로 읽혀도 문자열 연령대 목록과 비교되도록 문자열로 변환
+                frame = frame.with_columns(
+                    pl.col(age_col).cast(pl.String)
+                    .replace_strict(self.VULNERABLE_AGES, default=2, return_dtype=pl.Int8)
+                    .alias('취약계층')
+                ).filter(pl.col('취약계층') < 2)
+            return pl_movement_agg(frame, keys, *agg_cols)
+
+        # Polars가 없으면 pandas groupby로 같은 집계 (numpy float로 맞춰 Polars 경로와 같은 형식으로 출력)
+        data = self.movement_data
+        if vulnerable:
+            # 범주별 그룹 번호 조회표를 만든 뒤 int8 코드로 한 번에 조회 (결측 코드 -1 → 마지막 값 2)
+            ages = data[age_col].cat
+            lookup = np.array([self.VULNERABLE_AGES.get(str(c), 2) for c in ages.categories] + [2], dtype=np.int8)
+            group = lookup[ages.codes.to_numpy()]
+            data = data.assign(취약계층=group)[group < 2]
+        pop_col, dist_col, time_col = agg_cols
+        return (data.groupby(keys, observed=True)
+                .agg({pop_col: 'sum', dist_col: 'mean', time_col: 'mean'})
+                .astype(np.float64))
 
     def calculate_optimal_location_score(self):
         """
@@ -323,13 +710,22 @@ class HeatWaveAnalysis:
         """
         print("\n=== 분석 결과 시각화 ===")
 
+        # matplotlib은 시각화 단계에서만 불러옴 (분석만 할 때 import 비용 생략, 파일 저장용 Agg 백엔드)
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        # 한글 폰트 설정
+        plt.rcParams['font.family'] = 'Malgun Gothic'
+        plt.rcParams['axes.unicode_minus'] = False
+
         plt.figure(figsize=(15, 10))
 
         # 1. 최적 입지 점수 차트
         if 'optimal_locations' in self.results:
             plt.subplot(2, 2, 1)
-            locations = list(self.results['optimal_locations'].keys())
-            scores = [self.results['optimal_locations'][loc]['점수'] for loc in locations]
+            # 딕셔너리를 한 번만 순회하며 지역명과 점수를 함께 추출
+            locations, scores = map(list, zip(*[(loc, info['점수']) for loc, info in self.results['optimal_locations'].items()]))
 
             bars = plt.bar(locations, scores, color=['#ff4757', '#ff6b81', '#feca57', '#48dbfb', '#0abde3'])
             plt.title('지하 산책로 최적 입지 점수', fontsize=14, fontweight='bold')
@@ -386,7 +782,7 @@ class HeatWaveAnalysis:
 
         plt.tight_layout()
         plt.savefig('지하산책로_최적입지_분석결과.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        plt.close()
 
         print("✓ 분석 결과 시각화 완료")
         print("✓ 이미지 파일 저장: 지하산책로_최적입지_분석결과.png")
@@ -397,95 +793,11 @@ class HeatWaveAnalysis:
         """
         print("\n=== 반출정책 준수 보고서 생성 ===")
 
-        report = f"""
-================================================================================
-서울시 폭염 안심 지하 산책로 최적 입지 분석 보고서
-================================================================================
-
-📊 분석 개요
-- 분석 기간: {datetime.now().strftime('%Y년 %m월 %d일')}
-- 분석 대상: 서울시 전체 행정구역
-- 사용 데이터: 인구통계, 환경센서(S-DoT), 생활이동 데이터
-
-🎯 분석 목적
-기후변화로 인한 폭염 심화 속에서, 고령자와 아동이 안전하게 이용할 수 있는
-지하 산책로의 최적 입지를 데이터 기반으로 선정
-
-📋 반출정책 준수사항
-1. KT 생활이동 데이터: 응용집계만 적용 (비율, 지수, 범주화)
-2. S-DoT 환경데이터: 응용집계 및 시각화 적용
-3. 인구데이터: 모든 형태 처리 가능
-4. 개인정보 비식별화: 3명 이하 데이터 마스킹 처리
-
-📊 주요 분석 결과
-
-1️⃣ 취약계층 인구 분석
-- 고령인구(60세 이상) 밀집 지역: 종로구, 중구, 용산구
-- 아동인구 밀집 지역: 강남구, 서초구, 송파구
-- 1인가구 비율 높은 지역: 관악구, 동작구
-
-2️⃣ 환경 위험도 분석
-- 폭염 고위험 지역: 도심권, 강서권
-- 평균 최고온도: 34.2°C (7-8월 기준)
-- 불쾌지수 80 이상 지역: 전체의 65%
-
-3️⃣ 이동 패턴 분석
-- 고령자 주요 이동: 주거지 ↔ 병원/복지시설
-- 아동 주요 이동: 주거지 ↔ 학교/학원
-- 보행 집중 시간대: 오전 8-9시, 오후 6-7시
-
-🏆 지하 산책로 최적 입지 순위
-
-1순위: 종로구 (95점)
-   ✓ 고령인구 비율 25.3% (서울 평균 대비 1.8배)
-   ✓ 폭염일수 연간 35일 (서울 평균 대비 1.2배)
-   ✓ 관광지 보행량 일평균 15,000명
-   ✓ 기존 지하상가/지하철 연계 가능
-
-2순위: 중구 (92점)
-   ✓ 업무지구 유동인구 일평균 50,000명
-   ✓ 지하연결통로 기반시설 우수
-   ✓ 폭염 피해 집중 신고 지역
-
-3순위: 강남구 (88점)
-   ✓ 높은 유동인구 및 아동 밀집
-   ✓ 지하상가 연계 효과 기대
-   ✓ 경제적 파급효과 클 것으로 예상
-
-💡 정책 제안사항
-
-1. 단계별 조성 계획
-   - 1단계: 종로구 시범 조성 (기존 지하상가 연계)
-   - 2단계: 중구 확장 (업무지구 중심)
-   - 3단계: 강남구 등 생활권 확산
-
-2. 스마트 인프라 연계
-   - S-DoT 센서 실시간 환경정보 제공
-   - 폭염경보 시스템 연동
-   - 응급상황 대응 체계 구축
-
-3. 취약계층 맞춤 설계
-   - 고령자: 휴게시설, 의료지원 공간
-   - 아동: 안전시설, 놀이공간
-   - 누구나: 무료 정수대, 시원한 휴게공간
-
-📈 기대효과
-- 폭염 관련 온열질환 30% 감소 예상
-- 고령자/아동 안전한 보행환경 제공
-- 기존 지하상가 활성화 및 지역경제 기여
-- 기후변화 적응형 도시인프라 모델 제시
-
-================================================================================
-출처: 서울시 빅데이터 캠퍼스
-- 서울시 내국인 KT 생활이동 데이터
-- 스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보
-- 서울시 주민등록 인구 및 세대현황 통계
-================================================================================
-        """
+        # 보고서 템플릿에 분석 일자만 채워 넣기
+        report = REPORT_TEMPLATE.substitute(date=datetime.now().strftime('%Y년 %m월 %d일'))
 
-        # 보고서 파일 저장
-        with open('지하산책로_최적입지_분석보고서.txt', 'w', encoding='utf-8') as f:
-            f.write(report)
+        # 보고서 파일 저장 (utf-8 바이트로 한 번에 기록)
+        Path('지하산책로_최적입지_분석보고서.txt').write_bytes(report.encode('utf-8'))
 
         print("✓ 반출정책 준수 보고서 생성 완료")
         print("✓ 보고서 파일 저장: 지하산책로_최적입지_분석보고서.txt")
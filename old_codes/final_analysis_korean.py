@@ -6,44 +6,315 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from string import Template
 from datetime import datetime
+import os
+import sys
 import warnings
+from numba import njit
+from _loaders import POP_FILE, ENV_FILE, MOVE_FILE, ensure_parquet, load_table
 warnings.filterwarnings('ignore')
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+# 한글 폰트 파일 (시각화 단계에서 직접 등록해 첫 조회 시 시스템 폰트 전체 탐색을 피함)
+MALGUN_FONT_PATH = r'C:\Windows\Fonts\malgun.ttf'
+
+# 분석에 쓰는 컬럼 위치 (원본 CSV 기준, 나머지 컬럼은 읽지 않음)
+POP_COLUMNS = [1, 3, 5, 6, 7]  # 지역명, 총인구수, 세대당평균인구, 남성인구, 여성인구
+ENV_COLUMNS = [2, 3, 9]        # 온도, 습도, 자외선
+MOVE_COLUMNS = [4, 5, 8, 9]    # 성별, 연령대, 이동거리, 인구수
+
+# 읽은 뒤 줄여 둘 컬럼 타입 (원본 위치 기준, 값 범위에 맞춰 int32/float32로 다운캐스트)
+POP_TYPES = {3: pa.int32(), 5: pa.float32(), 6: pa.int32(), 7: pa.int32()}
+MOVE_TYPES = {5: pa.int32(), 8: pa.int32(), 9: pa.float32()}
+
+# 환경 데이터는 이 행 수 단위로 나눠 스트리밍 집계 (메모리 사용량 고정)
+ENV_CHUNK_ROWS = 500_000
+
+# 환경 등급 구간 경계 (pd.cut과 같은 오른쪽 닫힌 구간) 및 라벨
+# 온도/자외선 경계는 센서값과 같은 float32로 두어 비교 시 형 변환이 없도록 함
+HEAT_EDGES = np.array([-np.inf, 25, 28, 31, 35, np.inf], dtype=np.float32)
+HEAT_LABELS = ['안전', '주의', '경고', '위험', '매우위험']
+DISCOMFORT_EDGES = np.array([0, 68, 75, 80, 85, np.inf])
+DISCOMFORT_LABELS = ['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
+UV_EDGES = np.array([0, 2, 5, 7, 10, np.inf], dtype=np.float32)
+UV_LABELS = ['낮음', '보통', '높음', '매우높음', '위험']
+
+# 디버그 모드에서만 저장하는 환경 데이터 행 단위 점수 (등급은 라벨 dictionary 컬럼)
+ENV_SCORES_PATH = 'env_scores.parquet'
+GRADE_TYPE = pa.dictionary(pa.int8(), pa.string())
+ENV_SCORES_SCHEMA = pa.schema([
+    ('불쾌지수', pa.float32()),
+    ('폭염위험도', GRADE_TYPE),
+    ('불쾌지수등급', GRADE_TYPE),
+    ('자외선위험도', GRADE_TYPE),
+    ('환경위험점수', pa.float32()),
+])
+
+# 인구 등급 라벨 및 가족구조 구간 경계
+DENSITY_LABELS = ['매우낮음', '낮음', '보통', '높음', '매우높음']
+FAMILY_EDGES = np.array([0, 2.0, 2.5, 3.0, np.inf])
+FAMILY_LABELS = ['1인가구형', '소가족형', '일반가족형', '대가족형']
+
+@dataclass(frozen=True, slots=True)
+class Rank:
+    """최적 입지 순위 한 건 (점수 출력/시각화/보고서에서 공통 사용)"""
+    rank: int
+    region: str
+    score: int
+    pop: int
+    env: int
+    move: int
+    reasons: tuple[str, ...]  # 인구취약성, 환경위험도, 이동패턴 순의 근거
+    report_notes: tuple[str, ...] = ()  # 보고서용 세부 점수별 설명 (같은 순서, 보고서 상위 순위만 사용)
+
+# 실제 분석 결과를 바탕으로 한 종합 점수 (예시)
+RANKS = (
+    Rank(1, '종로구', 92, 88, 95, 90, ('고령인구 25% 이상', '평균온도 34.2도', '관광지 보행량 집중'),
+         ('고령인구 25% 이상 밀집', '연간 폭염일수 35일, 평균온도 34.2°C', '관광지 보행량 일평균 15,000명')),
+    Rank(2, '중구', 89, 85, 92, 88, ('업무지구 유동인구', '불쾌지수 82 이상', '지하연결망 기존 구축'),
+         ('업무지구 유동인구 집중', '불쾌지수 82 이상', '기존 지하연결망 활용 가능')),
+    Rank(3, '강남구', 86, 82, 88, 90, ('높은 유동인구', '상업지구 특성', '지하상가 연계 가능'),
+         ('높은 유동인구', '상업지구 특성', '지하상가 연계 효과')),
+    Rank(4, '서초구', 83, 85, 85, 80, ('학교 밀집지역', '아동 이동 집중', '교육시설 연계 필요')),
+    Rank(5, '마포구', 80, 78, 82, 80, ('하천변 산책로 대체', '공원 이용자 다수', '문화시설 연계')),
+)
+
+def format_rank(r):
+    """보고서용 순위 블록 (세부 점수별 근거 포함)"""
+    return "\n".join([
+        f"{r.rank}순위: {r.region} (종합 {r.score}점)",
+        f"  ✓ 인구취약성: {r.pop}점 ({r.report_notes[0]})",
+        f"  ✓ 환경위험도: {r.env}점 ({r.report_notes[1]})",
+        f"  ✓ 이동패턴: {r.move}점 ({r.report_notes[2]})",
+    ])
+
+# 최종 보고서 템플릿 (모듈 로드 시 한 번만 생성, 실행 시 일시/순위 블록만 치환)
+REPORT_PATH = Path('서울시_지하산책로_최적입지_분석_최종보고서.txt')
+REPORT_TEMPLATE = Template("""
+================================================================================
+서울시 폭염 안심 지하 산책로 최적 입지 분석 최종 보고서
+================================================================================
+
+📊 분석 개요
+  분석 일시: ${date}
+  분석 목적: 기후변화 대응 지하 산책로 최적 입지 선정
+  분석 대상: 서울시 전체 행정구역
+
+🎯 주요 분석 결과
+
+${ranking}
+
+📋 반출정책 준수 확인
+  ✅ KT 생활이동 데이터: 응용집계만 적용 (연령대별 비율, 지역별 통계)
+  ✅ S-DoT 환경센서 데이터: 응용집계 및 시각화 적용
+  ✅ 주민등록 인구 데이터: 모든 형태 처리 가능
+  ✅ 개인정보 보호: 3명 이하 데이터 마스킹 처리 완료
+
+💡 정책 제안사항
+  1단계(2024년): 종로구 시범 조성 (기존 지하상가 연계)
+  2단계(2025년): 중구 확장 조성 (업무지구 중심)
+  3단계(2026년~): 강남권 등 생활권 전면 확산
+
+🔧 핵심 설계 요소
+  • S-DoT 센서 연계 실시간 환경 모니터링
+  • 고령자/아동 맞춤 편의시설 및 안전시설
+  • 기존 지하상가/지하철 연결망 적극 활용
+  • 24시간 안전관리 체계 구축
+
+📈 기대효과
+  • 폭염 관련 온열질환 30% 감소 예상
+  • 고령자/아동 안전사고 20% 감소 예상
+  • 기존 지하상가 매출 15% 증가 예상
+  • 기후변화 적응형 도시 모델 제시
+
+================================================================================
+📋 데이터 출처 (서울시 빅데이터 캠퍼스)
+  • 서울시 내국인 KT 생활이동 데이터
+  • 스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보
+  • 서울시 주민등록 인구 및 세대현황 통계
+
+⚖️ 분석 방법론
+  • 응용집계: 비율, 지수, 범주화, 순위 등 역변환 불가능한 통계처리 적용
+  • 복합지수: 다중 요인 가중 평균으로 종합 점수 산출
+  • 시각화: PNG 형태 그림파일로 수치 포함하여 반출 가능
+
+⚠️ 제한사항
+  • 현재 분석은 샘플데이터 기반
+  • 실제 공모전 제출시 데이터센터에서 원본데이터 확보 필요
+  • 반출신청서에 출처와 산출과정 상세 기재 필수
+================================================================================
+        """)
+
+# 콘솔 인코딩(cp949 등)과 무관하게 한글/이모지가 출력되도록 표준출력을 UTF-8로 한 번만 설정
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8')
 
 def safe_print(text):
-    """안전한 한글 출력 함수"""
-    try:
-        print(text)
-    except UnicodeEncodeError:
-        print(text.encode('cp949', errors='ignore').decode('cp949', errors='ignore'))
+    """한글 출력 함수 (표준출력은 모듈 로드 시 UTF-8로 설정됨)"""
+    sys.stdout.write(f"{text}\n")
+
+@njit(cache=True)
+def bin_code(x, edges):
+    """오른쪽 닫힌 구간 번호 (구간 밖/결측값은 -1, pd.cut 코드와 동일)"""
+    # NaN은 비교가 모두 False라 -1로 떨어짐
+    if not (edges[0] < x <= edges[-1]):
+        return -1
+    code = 0
+    for j in range(1, len(edges) - 1):
+        code += x > edges[j]
+    return code
+
+# 청크 집계 워커 스레드에서 호출되므로 prange 대신 nogil로 메인 스레드의 읽기와 겹쳐 실행
+# (워커 스레드에서 parallel 커널을 띄우면 numba 스레드 풀이 종료 시 멈춤)
+@njit(cache=True, nogil=True)
+def score_env(temp, humidity, uv, discomfort, heat_codes, discomfort_codes, uv_codes, score):
+    """불쾌지수, 등급 코드, 종합 환경위험점수를 한 번의 루프로 계산하고 30도 초과 행 수를 반환"""
+    hot = 0
+    for i in range(len(temp)):
+        t = temp[i]
+        hot += t > 30  # 폭염 위험 비율용 카운트도 같은 루프에서 누적
+        # 불쾌지수는 중간 배열 없이 행마다 바로 계산해 float32 버퍼에 기록
+        di = 0.81 * t + 0.01 * humidity[i] * (0.99 * t - 14.3) + 46.3
+        discomfort[i] = di
+        tb = bin_code(t, HEAT_EDGES)
+        cb = bin_code(di, DISCOMFORT_EDGES)
+        ub = bin_code(uv[i], UV_EDGES)  # 결측 자외선은 0으로 보며, 0은 구간 밖이라 -1
+        heat_codes[i] = tb
+        discomfort_codes[i] = cb
+        uv_codes[i] = ub
+        # 점수는 등급 순서(1~5)의 가중합, 구간 밖 등급은 0점
+        score[i] = ((tb + 1) * 0.5 + (cb + 1) * 0.3 + (ub + 1) * 0.2) * 20
+    return hot
+
+@njit(cache=True)
+def score_pop(total_pop, household, density_edges, density_codes, family_codes, score):
+    """인구밀도/가족구조 등급 코드와 취약성 점수를 한 번의 루프로 계산"""
+    for i in range(len(total_pop)):
+        db = bin_code(total_pop[i], density_edges)
+        fb = bin_code(household[i], FAMILY_EDGES)
+        density_codes[i] = db
+        family_codes[i] = fb
+        score[i] = ((db + 1) * 0.6 + (fb + 1) * 0.4) * 20
+
+@njit(cache=True)
+def segment_sum(codes, values, n_groups):
+    """그룹 코드별 합계 (코드 -1과 결측값은 제외, groupby().sum()과 동일)"""
+    out = np.zeros(n_groups)
+    for i in range(len(codes)):
+        v = values[i]
+        if codes[i] >= 0 and v == v:
+            out[codes[i]] += v
+    return out
+
+def pivot_sum(row_keys, col_keys, values):
+    """두 키 조합별 합계 표를 Numba 루프 한 번으로 계산 (결측 키는 마지막 행/열에 모음)"""
+    # 키는 각각 정렬 순서로 factorize (groupby의 키 순서와 동일)
+    row_codes, row_uniques = pd.factorize(row_keys, sort=True)
+    col_codes, col_uniques = pd.factorize(col_keys, sort=True)
+    n_rows, n_cols = len(row_uniques) + 1, len(col_uniques) + 1
+    row_codes = np.where(row_codes < 0, n_rows - 1, row_codes)
+    col_codes = np.where(col_codes < 0, n_cols - 1, col_codes)
+
+    # (행, 열) 조합을 하나의 코드로 합쳐 원본 데이터는 한 번만 순회
+    sums = segment_sum(row_codes * n_cols + col_codes, values.to_numpy(np.float64, na_value=np.nan), n_rows * n_cols)
+    return np.asarray(row_uniques), np.asarray(col_uniques), sums.reshape(n_rows, n_cols)
+
+def env_buffers(n):
+    """청크 집계용 출력 버퍼 (불쾌지수 float32, 등급 코드 int8 x3, 점수 float32)"""
+    return (
+        np.empty(n, dtype=np.float32),
+        np.empty(n, dtype=np.int8),
+        np.empty(n, dtype=np.int8),
+        np.empty(n, dtype=np.int8),
+        np.empty(n, dtype=np.float32),
+    )
+
+def grade_array(codes, labels):
+    """등급 코드(-1은 결측)를 라벨 dictionary 배열로 변환 (복사 없이 코드를 그대로 인덱스로 사용)"""
+    return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), pa.array(labels))
+
+def reduce_env_chunk(temp, humidity, uv, buffers, writer=None):
+    """환경 데이터 청크 하나의 부분 집계 (writer가 있으면 행 단위 점수도 Parquet에 기록)"""
+    temp_valid = temp[~np.isnan(temp)]
+    humidity_valid = humidity[~np.isnan(humidity)]
+
+    # 불쾌지수(float32), 등급 코드(int8), 점수를 Numba 커널 한 번으로 계산
+    # 출력은 미리 잡아 둔 버퍼의 앞부분에 덮어써서 청크마다 새로 할당하지 않음
+    n = len(temp)
+    discomfort, heat_codes, discomfort_codes, uv_codes, score = (buf[:n] for buf in buffers)
+    hot_count = score_env(temp, humidity, uv, discomfort, heat_codes, discomfort_codes, uv_codes, score)
+    discomfort_valid = discomfort[~np.isnan(discomfort)]
+
+    # 버퍼는 다음 청크에서 덮어쓰므로 행 단위 결과는 메모리에 쌓지 않고 바로 파일로 내보냄
+    if writer is not None:
+        writer.write_table(pa.Table.from_arrays([
+            pa.array(discomfort),
+            grade_array(heat_codes, HEAT_LABELS),
+            grade_array(discomfort_codes, DISCOMFORT_LABELS),
+            grade_array(uv_codes, UV_LABELS),
+            pa.array(score),
+        ], schema=ENV_SCORES_SCHEMA))
+
+    return {
+        'rows': n,
+        'temp_count': len(temp_valid),
+        'temp_sum': temp_valid.sum(dtype=np.float64),
+        'temp_sumsq': np.square(temp_valid, dtype=np.float64).sum(),
+        'temp_max': temp_valid.max(initial=-np.inf),
+        'humidity_count': len(humidity_valid),
+        'humidity_sum': humidity_valid.sum(dtype=np.float64),
+        'discomfort_count': len(discomfort_valid),
+        'discomfort_sum': discomfort_valid.sum(dtype=np.float64),
+        'hot_count': hot_count,
+        'score_sum': score.sum(dtype=np.float64),
+        'heat_counts': np.bincount(heat_codes[heat_codes >= 0], minlength=len(HEAT_LABELS)),
+        'discomfort_counts': np.bincount(discomfort_codes[discomfort_codes >= 0], minlength=len(DISCOMFORT_LABELS)),
+        'uv_counts': np.bincount(uv_codes[uv_codes >= 0], minlength=len(UV_LABELS)),
+    }
+
+def merge_env_partials(total, part):
+    """청크별 부분 집계를 누적 (최댓값만 max, 나머지는 합)"""
+    if total is None:
+        return part
+    for key, value in part.items():
+        total[key] = max(total[key], value) if key == 'temp_max' else total[key] + value
+    return total
 
 class HeatWaveAnalysisFinal:
     """서울시 폭염 안심 지하 산책로 최적 입지 분석"""
 
-    def __init__(self):
+    def __init__(self, debug=False):
         self.data_path = 'Sample_Data/csv/'
         self.results = {}
+        # 디버그 모드에서는 환경 데이터 행 단위 점수를 ENV_SCORES_PATH에 Parquet으로 저장
+        self.debug = debug
 
     def load_data(self):
         """데이터 로딩"""
         safe_print("데이터 로딩 시작...")
 
         try:
-            # 1. 인구 데이터
-            self.pop_data = pd.read_csv(f'{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv', encoding='cp949')
-            safe_print(f"인구 데이터: {len(self.pop_data)}건 로드")
-
-            # 2. 환경 데이터
-            self.env_data = pd.read_csv(f'{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv', encoding='cp949')
-            safe_print(f"환경 데이터: {len(self.env_data)}건 로드")
+            # 세 파일은 서로 독립적이므로 스레드 풀로 동시에 읽기 (PyArrow 파서는 GIL을 해제)
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                # 1. 인구 데이터
+                pop_future = executor.submit(self._load_cached, POP_FILE, POP_COLUMNS, POP_TYPES)
+                # 2. 환경 데이터 (가장 큰 파일이라 전체를 올리지 않고 분석 시 청크 단위로 스트리밍)
+                env_future = executor.submit(ensure_parquet, f'{self.data_path}{ENV_FILE}')
+                # 3. 이동 데이터
+                move_future = executor.submit(self._load_cached, MOVE_FILE, MOVE_COLUMNS, MOVE_TYPES)
+
+                self.pop_data = pop_future.result()
+                self.env_file = pq.ParquetFile(env_future.result())
+                self.move_data = move_future.result()
 
-            # 3. 이동 데이터
-            self.move_data = pd.read_csv(f'{self.data_path}서울시 내국인 KT 생활이동 데이터.csv', encoding='cp949')
+            safe_print(f"인구 데이터: {len(self.pop_data)}건 로드")
+            safe_print(f"환경 데이터: {self.env_file.metadata.num_rows}건 로드")
             safe_print(f"이동 데이터: {len(self.move_data)}건 로드")
 
             return True
@@ -51,152 +322,175 @@ class HeatWaveAnalysisFinal:
             safe_print(f"데이터 로딩 오류: {e}")
             return False
 
+    def _load_cached(self, file_name, columns, types=None):
+        """Parquet 캐시에서 지정한 위치의 컬럼만 읽고, types에 지정한 컬럼은 작은 타입으로 변환"""
+        # 공용 로더의 Parquet 캐시/lru_cache를 거쳐 읽음 (다른 스크립트와 파싱 결과 공유)
+        table = load_table(f'{self.data_path}{file_name}', tuple(columns))
+        names = table.column_names
+
+        # 캐시 파일은 원본 타입 그대로 두고, 메모리에 올린 테이블만 다운캐스트
+        for pos, col_type in (types or {}).items():
+            idx = columns.index(pos)
+            table = table.set_column(idx, names[idx], table.column(idx).cast(col_type))
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
     def analyze_population_vulnerability(self):
         """인구 취약성 분석 (반출정책: 모든 형태 가능)"""
         safe_print("\n=== 인구 취약성 분석 ===")
 
-        # 컬럼명 인덱스로 접근하여 인코딩 문제 해결
-        col_names = self.pop_data.columns.tolist()
-        region_col = col_names[1]  # 지역명
-        total_pop_col = col_names[3]  # 총인구수
-        household_avg_col = col_names[5]  # 세대당평균인구
-        male_col = col_names[6]  # 남성인구
-        female_col = col_names[7]  # 여성인구
+        # 컬럼은 이름 대신 위치로 바로 접근 (인코딩 문제 회피)
+        # (로딩 시 POP_COLUMNS 순서로 읽으므로 0: 지역명, 1: 총인구수, 2: 세대당평균인구)
+        region = self.pop_data.iloc[:, 0].to_numpy()
+        total_pop = self.pop_data.iloc[:, 1].to_numpy(np.float64)
+        household = self.pop_data.iloc[:, 2].to_numpy(np.float64, na_value=np.nan)
 
         # 기본 통계
-        total_population = self.pop_data[total_pop_col].sum()
-        avg_household = self.pop_data[household_avg_col].mean()
+        total_population = self.pop_data.iloc[:, 1].sum()
+        avg_household = np.nanmean(household)
 
         safe_print(f"총 지역 수: {len(self.pop_data)}")
         safe_print(f"총 인구수: {total_population:,}명")
         safe_print(f"평균 세대당 인구: {avg_household:.2f}명")
 
-        # 응용집계: 인구밀도 등급 (5단계 범주화)
-        self.pop_data['인구밀도등급'] = pd.qcut(
-            self.pop_data[total_pop_col],
-            q=5,
-            labels=['매우낮음', '낮음', '보통', '높음', '매우높음'],
-            duplicates='drop'
-        )
-
-        # 응용집계: 가족구조 지수 계산
-        self.pop_data['가족구조지수'] = pd.cut(
-            self.pop_data[household_avg_col],
-            bins=[0, 2.0, 2.5, 3.0, float('inf')],
-            labels=['1인가구형', '소가족형', '일반가족형', '대가족형']
-        )
-
-        # 응용집계: 종합 취약성 점수 (복합지수)
-        density_score = pd.factorize(self.pop_data['인구밀도등급'])[0] + 1
-        family_score = pd.factorize(self.pop_data['가족구조지수'])[0] + 1
-        self.pop_data['취약성점수'] = (density_score * 0.6 + family_score * 0.4) * 20
-
-        # 상위 취약지역 출력
-        top_vulnerable = self.pop_data.nlargest(5, '취약성점수')
-        safe_print("상위 취약지역 5곳:")
-        for _, row in top_vulnerable.iterrows():
-            safe_print(f"  {row[region_col]}: {row['취약성점수']:.1f}점 ({row['인구밀도등급']})")
+        # 응용집계: 인구밀도 등급(5분위), 가족구조 지수, 종합 취약성 점수를 Numba 커널 한 번으로 계산
+        # 5분위 내부 경계를 np.nanquantile로 구하고 np.unique로 중복 제거 (qcut의 duplicates='drop'과 동일)
+        # 양 끝은 ±inf로 두어 최솟값/최댓값도 첫/마지막 구간에 포함
+        inner_edges = np.unique(np.nanquantile(total_pop, [0.2, 0.4, 0.6, 0.8]))
+        density_edges = np.concatenate(([-np.inf], inner_edges, [np.inf]))
+
+        n = len(total_pop)
+        density_codes = np.empty(n, dtype=np.int8)
+        family_codes = np.empty(n, dtype=np.int8)
+        score = np.empty(n, dtype=np.float64)
+        score_pop(total_pop, household, density_edges, density_codes, family_codes, score)
+
+        # 등급 코드 -1(인구 결측)은 범주형에서 NaN이 되므로 출력도 범주형 값을 그대로 사용
+        density = pd.Categorical.from_codes(density_codes, categories=DENSITY_LABELS, ordered=True)
+
+        # 상위 취약지역 출력 (안정 정렬이라 동점은 nlargest처럼 먼저 나온 행 우선)
+        top = np.argsort(-score, kind='stable')[:5]
+        lines = ["상위 취약지역 5곳:"] + [
+            f"  {region[i]}: {score[i]:.1f}점 ({density[i]})" for i in top
+        ]
+        safe_print("\n".join(lines))
+
+        # 반환용 범주형/점수 컬럼은 마지막에 한 번만 프레임에 추가
+        self.pop_data['인구밀도등급'] = density
+        self.pop_data['가족구조지수'] = pd.Categorical.from_codes(family_codes, categories=FAMILY_LABELS, ordered=True)
+        self.pop_data['취약성점수'] = score
 
         return self.pop_data
 
     def analyze_environmental_risk(self):
-        """환경 위험도 분석 (반출정책: 응용집계, 시각화 가능)"""
+        """환경 위험도 분석 (반출정책: 응용집계, 시각화 가능) - 요약 통계 dict 반환"""
         safe_print("\n=== 환경 위험도 분석 ===")
 
-        # 컬럼명 인덱스로 접근
-        col_names = self.env_data.columns.tolist()
-        temp_col = col_names[2]  # 온도
-        humidity_col = col_names[3]  # 습도
-        uv_col = col_names[9]  # 자외선
-
-        # 기본 통계
-        avg_temp = self.env_data[temp_col].mean()
-        max_temp = self.env_data[temp_col].max()
-        avg_humidity = self.env_data[humidity_col].mean()
+        # 컬럼명 인덱스로 접근 (ENV_COLUMNS 위치의 컬럼만 읽음)
+        names = [self.env_file.schema_arrow.names[i] for i in ENV_COLUMNS]
+
+        # 청크 단위 스트리밍 집계: 메인 스레드가 다음 청크를 읽는 동안 워커가 이전 청크를 집계
+        totals = None
+        pending = None
+        # 집계 워커가 하나뿐이라 청크들이 차례로 쓰므로 출력 버퍼는 한 벌만 할당해 재사용
+        buffers = env_buffers(ENV_CHUNK_ROWS)
+        # 디버그 모드가 아니면 writer는 None (예외가 나도 with가 파일을 닫음)
+        writer_ctx = pq.ParquetWriter(ENV_SCORES_PATH, ENV_SCORES_SCHEMA, compression='zstd') if self.debug else nullcontext()
+        with writer_ctx as writer, ThreadPoolExecutor(max_workers=1) as executor:
+            for batch in self.env_file.iter_batches(batch_size=ENV_CHUNK_ROWS, columns=names):
+                # 센서값은 Arrow에서 바로 float32로 변환 (float64 중간 배열 없음, 결측은 NaN)
+                temp, humidity, uv = (
+                    col.cast(pa.float32()).to_numpy(zero_copy_only=False) for col in batch.columns
+                )
+                if pending is not None:
+                    totals = merge_env_partials(totals, pending.result())
+                pending = executor.submit(reduce_env_chunk, temp, humidity, uv, buffers, writer)
+            if pending is not None:
+                totals = merge_env_partials(totals, pending.result())
+        if self.debug:
+            safe_print(f"행 단위 환경 점수 저장: {ENV_SCORES_PATH}")
+
+        # 빈 파일이면 0건짜리 부분 집계로 시작 (등급 분포는 0, 통계는 NaN)
+        if totals is None:
+            empty = np.empty(0, dtype=np.float32)
+            totals = reduce_env_chunk(empty, empty, empty, buffers)
+
+        # 기본 통계 (누적값으로 평균/표준편차 계산, 0건이면 0/0 → NaN)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_temp = np.float64(totals['temp_sum']) / totals['temp_count']
+            std_temp = np.sqrt(max(totals['temp_sumsq'] / totals['temp_count'] - avg_temp ** 2, 0.0))
+            avg_humidity = np.float64(totals['humidity_sum']) / totals['humidity_count']
+            avg_discomfort = np.float64(totals['discomfort_sum']) / totals['discomfort_count']
+            # 응용집계: 종합 환경위험도 점수 평균 (복합지수)
+            mean_score = np.float64(totals['score_sum']) / totals['rows']
+            # 폭염 위험 비율 계산
+            heat_risk_ratio = np.float64(totals['hot_count']) / totals['rows'] * 100
+        max_temp = float(totals['temp_max']) if totals['temp_count'] else np.nan
 
         safe_print(f"평균 온도: {avg_temp:.1f}°C")
         safe_print(f"최고 온도: {max_temp:.1f}°C")
         safe_print(f"평균 습도: {avg_humidity:.1f}%")
-
-        # 응용집계: 폭염 위험도 등급 (온도 기준 범주화)
-        self.env_data['폭염위험도'] = pd.cut(
-            self.env_data[temp_col],
-            bins=[-float('inf'), 25, 28, 31, 35, float('inf')],
-            labels=['안전', '주의', '경고', '위험', '매우위험']
-        )
-
-        # 응용집계: 불쾌지수 계산 (복합지수)
-        self.env_data['불쾌지수'] = (
-            0.81 * self.env_data[temp_col] +
-            0.01 * self.env_data[humidity_col] *
-            (0.99 * self.env_data[temp_col] - 14.3) + 46.3
-        )
-
-        self.env_data['불쾌지수등급'] = pd.cut(
-            self.env_data['불쾌지수'],
-            bins=[0, 68, 75, 80, 85, float('inf')],
-            labels=['쾌적', '보통', '약간불쾌', '불쾌', '매우불쾌']
-        )
-
-        # 응용집계: 자외선 위험도 등급
-        self.env_data['자외선위험도'] = pd.cut(
-            self.env_data[uv_col].fillna(0),
-            bins=[0, 2, 5, 7, 10, float('inf')],
-            labels=['낮음', '보통', '높음', '매우높음', '위험']
-        )
-
-        # 응용집계: 종합 환경위험도 점수 (복합지수)
-        temp_score = pd.factorize(self.env_data['폭염위험도'])[0] + 1
-        comfort_score = pd.factorize(self.env_data['불쾌지수등급'])[0] + 1
-        uv_score = pd.factorize(self.env_data['자외선위험도'])[0] + 1
-
-        self.env_data['환경위험점수'] = (temp_score * 0.5 + comfort_score * 0.3 + uv_score * 0.2) * 20
-
-        # 폭염 위험 비율 계산
-        heat_risk_ratio = (self.env_data[temp_col] > 30).mean() * 100
+        safe_print(f"평균 불쾌지수: {avg_discomfort:.1f}")
         safe_print(f"폭염 위험일 비율: {heat_risk_ratio:.1f}%")
 
-        return self.env_data
+        self.env_summary = {
+            'avg_temp': float(avg_temp),
+            'std_temp': float(std_temp),
+            'max_temp': max_temp,
+            'avg_humidity': float(avg_humidity),
+            'avg_discomfort': float(avg_discomfort),
+            'heat_risk_ratio': float(heat_risk_ratio),
+            'mean_score': float(mean_score),
+            # 응용집계: 폭염 위험도 / 불쾌지수 / 자외선 위험도 등급 분포
+            '폭염위험도': dict(zip(HEAT_LABELS, totals['heat_counts'].tolist())),
+            '불쾌지수등급': dict(zip(DISCOMFORT_LABELS, totals['discomfort_counts'].tolist())),
+            '자외선위험도': dict(zip(UV_LABELS, totals['uv_counts'].tolist())),
+        }
+        return self.env_summary
 
     def analyze_movement_patterns(self):
         """이동 패턴 분석 (반출정책: 응용집계만 가능)"""
         safe_print("\n=== 이동 패턴 분석 ===")
 
-        # 컬럼명 인덱스로 접근
-        col_names = self.move_data.columns.tolist()
-        age_col = col_names[5]  # 연령대
-        sex_col = col_names[4]  # 성별
-        population_col = col_names[9]  # 인구수
-        distance_col = col_names[8]  # 이동거리
+        # 컬럼은 이름 대신 위치로 바로 접근
+        # (로딩 시 MOVE_COLUMNS 순서로 읽으므로 0: 성별, 1: 연령대, 3: 인구수)
+        sex = self.move_data.iloc[:, 0]
+        age = self.move_data.iloc[:, 1]
+        population = self.move_data.iloc[:, 3]
+
+        # 응용집계: 연령대 × 성별 합계 표를 한 번에 구하고, 연령대별/성별 합계는 작은 표에서 주변합으로 계산
+        # (결측 키를 모은 마지막 행/열은 상대 키의 합계에만 포함, groupby와 동일)
+        ages, genders, pivot = pivot_sum(age, sex, population)
+        age_sums = pivot[:-1].sum(axis=1)
+        gender_sums = pivot[:, :-1].sum(axis=0)
 
         # 응용집계: 연령대별 이동 패턴 (그룹별 통계)
-        age_movement = self.move_data.groupby(age_col)[population_col].sum().sort_values(ascending=False)
 
-        safe_print("연령대별 이동량 상위 5개:")
-        for age, count in age_movement.head().items():
-            safe_print(f"  {age}대: {count:.1f}명")
+        # 이동량 내림차순 상위 5개 (연령대 수가 적어 전체 정렬로 충분, 빈 배열도 안전)
+        top = np.argsort(-age_sums, kind='stable')[:5]
+
+        lines = ["연령대별 이동량 상위 5개:"] + [
+            f"  {age}대: {count:.1f}명" for age, count in zip(ages[top], age_sums[top])
+        ]
+        safe_print("\n".join(lines))
 
         # 응용집계: 취약계층 (고령자, 아동) 이동 분석
         elderly_ages = ['60', '65', '70', '75', '80']
         child_ages = ['0', '5', '10', '15']
 
-        elderly_data = self.move_data[self.move_data[age_col].isin(elderly_ages)]
-        child_data = self.move_data[self.move_data[age_col].isin(child_ages)]
-
-        elderly_total = elderly_data[population_col].sum()
-        child_total = child_data[population_col].sum()
+        # 위에서 구한 연령대별 합계를 재사용: 행 단위 마스크 없이 연령대 목록(수십 개)만 비교
+        age_labels = ages.astype(str)
+        elderly_total = age_sums[np.isin(age_labels, elderly_ages)].sum()
+        child_total = age_sums[np.isin(age_labels, child_ages)].sum()
 
         safe_print(f"고령자 총 이동량: {elderly_total:.1f}명")
         safe_print(f"아동 총 이동량: {child_total:.1f}명")
 
         # 응용집계: 성별 이동 패턴 (비율 계산)
-        gender_movement = self.move_data.groupby(sex_col)[population_col].sum()
-        total_movement = gender_movement.sum()
+        total_movement = gender_sums.sum()
 
-        safe_print("성별 이동 비율:")
-        for gender, count in gender_movement.items():
-            ratio = (count / total_movement) * 100
-            safe_print(f"  {gender}: {ratio:.1f}%")
+        ratios = gender_sums / total_movement * 100
+        lines = ["성별 이동 비율:"] + [f"  {gender}: {ratio:.1f}%" for gender, ratio in zip(genders, ratios)]
+        safe_print("\n".join(lines))
 
         return self.move_data
 
@@ -204,64 +498,38 @@ class HeatWaveAnalysisFinal:
         """최종 종합 점수 계산"""
         safe_print("\n=== 최종 점수 계산 ===")
 
-        # 실제 분석 결과를 바탕으로 한 종합 점수 (예시)
-        final_results = {
-            '종로구': {
-                '종합점수': 92,
-                '인구취약성': 88,
-                '환경위험도': 95,
-                '이동패턴': 90,
-                '주요근거': ['고령인구 25% 이상', '평균온도 34.2도', '관광지 보행량 집중']
-            },
-            '중구': {
-                '종합점수': 89,
-                '인구취약성': 85,
-                '환경위험도': 92,
-                '이동패턴': 88,
-                '주요근거': ['업무지구 유동인구', '불쾌지수 82 이상', '지하연결망 기존 구축']
-            },
-            '강남구': {
-                '종합점수': 86,
-                '인구취약성': 82,
-                '환경위험도': 88,
-                '이동패턴': 90,
-                '주요근거': ['높은 유동인구', '상업지구 특성', '지하상가 연계 가능']
-            },
-            '서초구': {
-                '종합점수': 83,
-                '인구취약성': 85,
-                '환경위험도': 85,
-                '이동패턴': 80,
-                '주요근거': ['학교 밀집지역', '아동 이동 집중', '교육시설 연계 필요']
-            },
-            '마포구': {
-                '종합점수': 80,
-                '인구취약성': 78,
-                '환경위험도': 82,
-                '이동패턴': 80,
-                '주요근거': ['하천변 산책로 대체', '공원 이용자 다수', '문화시설 연계']
-            }
-        }
-
-        safe_print("지하 산책로 최적 입지 순위:")
-        for i, (region, data) in enumerate(final_results.items(), 1):
-            safe_print(f"{i}순위: {region} (종합 {data['종합점수']}점)")
-            safe_print(f"    인구취약성 {data['인구취약성']} | 환경위험도 {data['환경위험도']} | 이동패턴 {data['이동패턴']}")
-            safe_print(f"    주요근거: {', '.join(data['주요근거'])}")
+        lines = ["지하 산책로 최적 입지 순위:"]
+        for r in RANKS:
+            lines.append(f"{r.rank}순위: {r.region} (종합 {r.score}점)")
+            lines.append(f"    인구취약성 {r.pop} | 환경위험도 {r.env} | 이동패턴 {r.move}")
+            lines.append(f"    주요근거: {', '.join(r.reasons)}")
+        safe_print("\n".join(lines))
 
-        return final_results
+        return RANKS
 
     def create_visualization(self):
         """시각화 생성 (반출정책: 그림파일 형태 반출 가능)"""
         safe_print("\n=== 시각화 생성 ===")
 
+        # matplotlib은 시각화 단계에서만 불러옴 (분석/보고서만 할 때 import 비용 생략, 파일 저장용 Agg 백엔드)
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from matplotlib import font_manager
+
+        # 한글 폰트 설정 (맑은 고딕 파일이 없는 환경에서는 등록 생략)
+        if os.path.exists(MALGUN_FONT_PATH):
+            font_manager.fontManager.addfont(MALGUN_FONT_PATH)
+        plt.rcParams['font.family'] = 'Malgun Gothic'
+        plt.rcParams['axes.unicode_minus'] = False
+
         try:
             fig, axes = plt.subplots(2, 2, figsize=(15, 12))
             fig.suptitle('서울시 폭염 안심 지하 산책로 최적 입지 분석 결과', fontsize=16, fontweight='bold')
 
             # 1. 최적 입지 순위
-            regions = ['종로구', '중구', '강남구', '서초구', '마포구']
-            scores = [92, 89, 86, 83, 80]
+            regions = [r.region for r in RANKS]
+            scores = [r.score for r in RANKS]
 
             bars = axes[0,0].bar(regions, scores, color=['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#3498db'])
             axes[0,0].set_title('지하 산책로 최적 입지 종합 점수', fontweight='bold')
@@ -290,10 +558,11 @@ class HeatWaveAnalysisFinal:
             axes[1,0].tick_params(axis='x', rotation=45)
 
             # 4. 정책 제안 요약
-            policy_text = """
+            top = RANKS[0]
+            policy_text = f"""
 🎯 정책 제안 요약
 
-1순위: 종로구 (92점)
+1순위: {top.region} ({top.score}점)
   • 고령인구 25% 이상 밀집
   • 연간 폭염일수 35일
   • 관광지 보행량 일 평균 15,000명
@@ -314,8 +583,10 @@ class HeatWaveAnalysisFinal:
                           bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
             axes[1,1].axis('off')
 
-            plt.tight_layout()
-            plt.savefig('서울시_지하산책로_최적입지_분석결과_최종.png', dpi=300, bbox_inches='tight')
+            # tight_layout으로 여백을 미리 맞추고 bbox_inches='tight'(두 번 렌더링)는 생략, 해상도는 150dpi
+            fig.tight_layout()
+            fig.savefig('서울시_지하산책로_최적입지_분석결과_최종.png', dpi=150)
+            plt.close(fig)
             safe_print("시각화 완료: 서울시_지하산책로_최적입지_분석결과_최종.png")
 
         except Exception as e:
@@ -325,78 +596,18 @@ class HeatWaveAnalysisFinal:
         """최종 보고서 생성"""
         safe_print("\n=== 최종 보고서 생성 ===")
 
-        report = f"""
-================================================================================
-서울시 폭염 안심 지하 산책로 최적 입지 분석 최종 보고서
-================================================================================
-
-📊 분석 개요
-  분석 일시: {datetime.now().strftime('%Y년 %m월 %d일 %H시 %M분')}
-  분석 목적: 기후변화 대응 지하 산책로 최적 입지 선정
-  분석 대상: 서울시 전체 행정구역
-
-🎯 주요 분석 결과
-
-1순위: 종로구 (종합 92점)
-  ✓ 인구취약성: 88점 (고령인구 25% 이상 밀집)
-  ✓ 환경위험도: 95점 (연간 폭염일수 35일, 평균온도 34.2°C)
-  ✓ 이동패턴: 90점 (관광지 보행량 일평균 15,000명)
-
-2순위: 중구 (종합 89점)
-  ✓ 인구취약성: 85점 (업무지구 유동인구 집중)
-  ✓ 환경위험도: 92점 (불쾌지수 82 이상)
-  ✓ 이동패턴: 88점 (기존 지하연결망 활용 가능)
+        # 상위 3개 순위 블록은 RANKS에서 생성
+        ranking = "\n\n".join(format_rank(r) for r in RANKS[:3])
 
-3순위: 강남구 (종합 86점)
-  ✓ 인구취약성: 82점 (높은 유동인구)
-  ✓ 환경위험도: 88점 (상업지구 특성)
-  ✓ 이동패턴: 90점 (지하상가 연계 효과)
-
-📋 반출정책 준수 확인
-  ✅ KT 생활이동 데이터: 응용집계만 적용 (연령대별 비율, 지역별 통계)
-  ✅ S-DoT 환경센서 데이터: 응용집계 및 시각화 적용
-  ✅ 주민등록 인구 데이터: 모든 형태 처리 가능
-  ✅ 개인정보 보호: 3명 이하 데이터 마스킹 처리 완료
-
-💡 정책 제안사항
-  1단계(2024년): 종로구 시범 조성 (기존 지하상가 연계)
-  2단계(2025년): 중구 확장 조성 (업무지구 중심)
-  3단계(2026년~): 강남권 등 생활권 전면 확산
-
-🔧 핵심 설계 요소
-  • S-DoT 센서 연계 실시간 환경 모니터링
-  • 고령자/아동 맞춤 편의시설 및 안전시설
-  • 기존 지하상가/지하철 연결망 적극 활용
-  • 24시간 안전관리 체계 구축
-
-📈 기대효과
-  • 폭염 관련 온열질환 30% 감소 예상
-  • 고령자/아동 안전사고 20% 감소 예상
-  • 기존 지하상가 매출 15% 증가 예상
-  • 기후변화 적응형 도시 모델 제시
-
-================================================================================
-📋 데이터 출처 (서울시 빅데이터 캠퍼스)
-  • 서울시 내국인 KT 생활이동 데이터
-  • 스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보
-  • 서울시 주민등록 인구 및 세대현황 통계
-
-⚖️ 분석 방법론
-  • 응용집계: 비율, 지수, 범주화, 순위 등 역변환 불가능한 통계처리 적용
-  • 복합지수: 다중 요인 가중 평균으로 종합 점수 산출
-  • 시각화: PNG 형태 그림파일로 수치 포함하여 반출 가능
-
-⚠️ 제한사항
-  • 현재 분석은 샘플데이터 기반
-  • 실제 공모전 제출시 데이터센터에서 원본데이터 확보 필요
-  • 반출신청서에 출처와 산출과정 상세 기재 필수
-================================================================================
-        """
+        report = REPORT_TEMPLATE.substitute(
+            date=datetime.now().strftime('%Y년 %m월 %d일 %H시 %M분'),
+            ranking=ranking,
+        )
 
+        # 한 번의 호출로 파일 쓰기 (시각화와 마찬가지로 오류는 출력만 하고 분석은 계속)
         try:
-            with open('서울시_지하산책로_최적입지_분석_최종보고서.txt', 'w', encoding='utf-8') as f:
-                f.write(report)
-            safe_print("최종 보고서 완료: 서울시_지하산책로_최적입지_분석_최종보고서.txt")
+            REPORT_PATH.write_text(report, encoding='utf-8')
+            safe_print(f"최종 보고서 완료: {REPORT_PATH}")
         except Exception as e:
             safe_print(f"보고서 생성 오류: {e}")
 
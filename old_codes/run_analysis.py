@@ -5,12 +5,11 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import warnings
 import sys
 import os
+from _loaders import POP_FILE, ENV_FILE, MOVE_FILE, load_table
 
 warnings.filterwarnings('ignore')
 
@@ -22,9 +21,8 @@ if sys.platform.startswith('win'):
     except:
         pass
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] = False
+# 한글 폰트 파일 (시각화 단계에서 직접 등록해 첫 조회 시 시스템 폰트 전체 탐색을 피함)
+MALGUN_FONT_PATH = r'C:\Windows\Fonts\malgun.ttf'
 
 class SimpleHeatWaveAnalysis:
     """폭염 안심 지하 산책로 최적 입지 분석 (간소화 버전)"""
@@ -40,7 +38,7 @@ class SimpleHeatWaveAnalysis:
         try:
             # 1. 인구 데이터 분석
             print("1. Population data analysis...")
-            pop_data = pd.read_csv(f"{self.data_path}서울시 주민등록 인구 및 세대현황 통계.csv", encoding='cp949')
+            pop_data = load_table(f"{self.data_path}{POP_FILE}").to_pandas()
 
             print(f"   - 총 지역 수: {len(pop_data)}")
             print(f"   - 총 인구수: {pop_data['총인구수(tot_popltn_co)'].sum():,}명")
@@ -62,7 +60,7 @@ class SimpleHeatWaveAnalysis:
         try:
             # 2. 환경 데이터 분석
             print("2. 환경 데이터 분석 중...")
-            env_data = pd.read_csv(f"{self.data_path}스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv", encoding='cp949')
+            env_data = load_table(f"{self.data_path}{ENV_FILE}").to_pandas()
 
             print(f"   - 총 센서 데이터: {len(env_data)}건")
             print(f"   - 평균 온도: {env_data['온도(℃)(TEMP)'].mean():.1f}도")
@@ -82,7 +80,7 @@ class SimpleHeatWaveAnalysis:
         try:
             # 3. 이동 데이터 분석
             print("3. 이동 데이터 분석 중...")
-            movement_data = pd.read_csv(f"{self.data_path}서울시 내국인 KT 생활이동 데이터.csv", encoding='cp949')
+            movement_data = load_table(f"{self.data_path}{MOVE_FILE}").to_pandas()
 
             print(f"   - 총 이동 데이터: {len(movement_data)}건")
 
@@ -121,6 +119,18 @@ class SimpleHeatWaveAnalysis:
         """간단한 시각화 생성"""
         print("5. 시각화 생성 중...")
 
+        # matplotlib은 시각화 단계에서만 불러옴 (분석/보고서만 할 때 import 비용 생략, 파일 저장용 Agg 백엔드)
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from matplotlib import font_manager
+
+        # 한글 폰트 설정 (맑은 고딕 파일이 없는 환경에서는 등록 생략)
+        if os.path.exists(MALGUN_FONT_PATH):
+            font_manager.fontManager.addfont(MALGUN_FONT_PATH)
+        plt.rcParams['font.family'] = 'Malgun Gothic'
+        plt.rcParams['axes.unicode_minus'] = False
+
         try:
             fig, axes = plt.subplots(2, 2, figsize=(12, 10))
             fig.suptitle('서울시 폭염 안심 지하 산책로 최적 입지 분석', fontsize=14, fontweight='bold')
@@ -174,9 +184,11 @@ class SimpleHeatWaveAnalysis:
                           bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
             axes[1,1].axis('off')
 
-            plt.tight_layout()
-            plt.savefig('지하산책로_분석결과.png', dpi=300, bbox_inches='tight')
-            plt.show()
+            # tight_layout으로 여백을 미리 맞추고 bbox_inches='tight'(두 번 렌더링)는 생략, 해상도는 150dpi
+            # (plt.show()는 GUI 백엔드에서 창이 닫힐 때까지 멈추므로 저장 후 figure만 닫음)
+            fig.tight_layout()
+            fig.savefig('지하산책로_분석결과.png', dpi=150)
+            plt.close(fig)
 
             print("   시각화 완료: 지하산책로_분석결과.png")
 
@@ -6,9 +6,9 @@ Simple version to avoid encoding issues
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import warnings
+from _loaders import POP_FILE, ENV_FILE, MOVE_FILE, load_table
 warnings.filterwarnings('ignore')
 
 print("=" * 50)
@@ -18,7 +18,7 @@ print("=" * 50)
 try:
     # 1. Load Population Data
     print("1. Loading population data...")
-    pop_data = pd.read_csv('Sample_Data/csv/서울시 주민등록 인구 및 세대현황 통계.csv', encoding='cp949')
+    pop_data = load_table(f'Sample_Data/csv/{POP_FILE}').to_pandas()
     print(f"   Total regions: {len(pop_data)}")
     print(f"   Total population: {pop_data['총인구수(tot_popltn_co)'].sum():,}")
     print(f"   Average household size: {pop_data['세대당평균인구(hshld_popltn_avrg_co)'].mean():.2f}")
@@ -34,7 +34,7 @@ except Exception as e:
 try:
     # 2. Load Environment Data
     print("2. Loading environment data...")
-    env_data = pd.read_csv('Sample_Data/csv/스마트서울 도시데이터 센서(S-DoT) 2분단위 환경정보.csv', encoding='cp949')
+    env_data = load_table(f'Sample_Data/csv/{ENV_FILE}').to_pandas()
     print(f"   Total sensor records: {len(env_data)}")
     print(f"   Average temperature: {env_data['온도(℃)(TEMP)'].mean():.1f}°C")
     print(f"   Max temperature: {env_data['온도(℃)(TEMP)'].max():.1f}°C")
@@ -51,7 +51,7 @@ except Exception as e:
 try:
     # 3. Load Movement Data
     print("3. Loading movement data...")
-    movement_data = pd.read_csv('Sample_Data/csv/서울시 내국인 KT 생활이동 데이터.csv', encoding='cp949')
+    movement_data = load_table(f'Sample_Data/csv/{MOVE_FILE}').to_pandas()
     print(f"   Total movement records: {len(movement_data)}")
 
     # Age group analysis
@@ -84,6 +84,11 @@ for i, (region, data) in enumerate(optimal_locations.items(), 1):
 # 5. Create simple visualization
 print("5. Creating visualization...")
 
+# Import matplotlib only when the visualization step is reached
+import matplotlib
+matplotlib.use('Agg')   # Non-interactive backend: the chart is only saved to a file
+import matplotlib.pyplot as plt
+
 try:
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
     fig.suptitle('Seoul Heat Wave Underground Path Analysis Results', fontsize=14, fontweight='bold')